@@ -0,0 +1,168 @@
+"""Browserless fetching of the records of filter combinations.
+
+HttpBackend calls a JSON data endpoint directly with a pooled asyncio HTTP client (requires
+aiohttp) and fetches many jobs and pages concurrently, writing the same records as scrape_data to
+OutputSinks. The site does not document its endpoint: its URL and query parameter names have to be
+taken from the requests the grid makes (the browser's network tab) and passed in.
+"""
+import asyncio
+import math
+import time
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import network_capture
+import sinks
+from batch import JobResult
+from metrics import RunMetrics
+
+FILTER_PARAMS = {"view_type": "view_type", "period": "period", "year": "year", "region": "region",
+                 "sub_region": "sub_region"}
+
+
+class HttpBackend:
+    """Scrape by calling the site's JSON data endpoint directly, without a browser (requires aiohttp).
+
+    The endpoint is queried with the job's filters plus page and page size parameters; params maps
+    the job fields to the endpoint's parameter names and defaults to the field names themselves.
+    Query parameters already present in endpoint are kept. At most concurrency requests
+    are in flight at once over one pooled connection set, shared by all jobs.
+    """
+
+    def __init__(self, logger, endpoint, concurrency=8, page_size=100, timeout=30,
+                 retries=3, retry_backoff=1.0, params=None, page_param="page", page_size_param="pageSize"):
+        """Initialize the backend with a logger, the data endpoint and its request limits."""
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            raise ImportError("The HTTP backend requires aiohttp: pip install aiohttp")
+        self.logger = logger
+        parts = urlsplit(endpoint)
+        self.endpoint = urlunsplit(parts._replace(query=""))
+        self.base_params = dict(parse_qsl(parts.query))
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.params = dict(FILTER_PARAMS, **(params or {}))
+        self.page_param = page_param
+        self.page_size_param = page_size_param
+
+    def scrape_jobs(self, jobs, sink_factory, cache=None, force_refresh=False):
+        """Scrape all jobs concurrently and return their JobResults in job order."""
+        return asyncio.run(self._scrape_all(list(jobs), sink_factory, cache, force_refresh))
+
+    async def _scrape_all(self, jobs, sink_factory, cache, force_refresh):
+        import aiohttp
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        self.logger.log(f"Fetching {len(jobs)} jobs from {self.endpoint} with {self.concurrency} concurrent requests")
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"Accept": "application/json"}) as session:
+            requests = asyncio.Semaphore(self.concurrency)
+            return await asyncio.gather(*(self._run_job(session, requests, job, sink_factory, cache, force_refresh)
+                                          for job in jobs))
+
+    async def _run_job(self, session, requests, job, sink_factory, cache, force_refresh):
+        """Scrape one job and return its JobResult."""
+        start = time.time()
+        metrics = RunMetrics()
+        output = None
+        try:
+            # Open the sink only once the first page has arrived, so waiting jobs hold no files
+            first = await self._fetch_page(session, requests, job, 0, self.page_size, metrics)
+            sink = sink_factory(job)
+            output = sink.path
+            with sink, metrics.phase("scrape"):
+                rows = await self._scrape_into(session, requests, job, first, sink, cache, force_refresh, metrics)
+            self.logger.log(f"Job {tuple(job)}: {rows} rows in {time.time() - start:.2f} seconds")
+            return JobResult(job, output=output, rows=rows, duration=time.time() - start, metrics=metrics.to_dict())
+        except Exception as e:
+            self.logger.log(f"Job {tuple(job)} failed: {str(e)}", "error")
+            return JobResult(job, output=output, error=str(e), duration=time.time() - start,
+                             metrics=metrics.to_dict())
+
+    async def _scrape_into(self, session, requests, job, first, sink, cache, force_refresh, metrics):
+        """Write all pages of a job to sink, serving or filling the cache, and return the row count."""
+        records, total = self.parse_page(first)
+        if total is None:
+            total = len(records)
+        if cache is not None and not force_refresh:
+            cached = cache.get(job, total)
+            if cached is not None:
+                metrics.count("cache_hits")
+                metrics.count("rows", len(cached))
+                sink.write_page(cached)
+                return len(cached)
+        if cache is None:
+            return await self._write_pages(session, requests, job, records, total, sink, metrics)
+        with cache.writer(job, total) as cache_writer:
+            rows = await self._write_pages(session, requests, job, records, total,
+                                           sinks.TeeSink(sink, cache_writer), metrics)
+            cache_writer.commit()
+        return rows
+
+    async def _write_pages(self, session, requests, job, records, total, sink, metrics):
+        """Fetch the remaining pages concurrently and write every page to sink in order."""
+        # The endpoint may cap the page size, so page through in steps of what it actually returned
+        page_size = len(records) if 0 < len(records) < min(self.page_size, total) else self.page_size
+        pages = max(math.ceil(total / page_size), 1)
+        tasks = [asyncio.ensure_future(self._fetch_page(session, requests, job, page, page_size, metrics))
+                 for page in range(1, pages)]
+        try:
+            sink.write_page(records)
+            metrics.count("pages")
+            for task in tasks:
+                page_records, _ = self.parse_page(await task)
+                sink.write_page(page_records)
+                metrics.count("pages")
+        finally:
+            for task in tasks:
+                task.cancel()
+        metrics.count("rows", sink.rows_written)
+        if sink.rows_written != total:
+            self.logger.log(f"Job {tuple(job)}: endpoint reported {total} rows but returned {sink.rows_written}",
+                            "warning")
+        return sink.rows_written
+
+    def request_params(self, job, page, page_size):
+        """Return the query parameters for one page of a job."""
+        params = dict(self.base_params)
+        for field, value in zip(FILTER_PARAMS, job):
+            if value is not None and self.params.get(field):
+                params[self.params[field]] = str(value)
+        params[self.page_param] = str(page)
+        params[self.page_size_param] = str(page_size)
+        return params
+
+    async def _fetch_page(self, session, requests, job, page, page_size, metrics):
+        """Return the decoded JSON of one page, retrying with exponential backoff."""
+        import aiohttp
+        params = self.request_params(job, page, page_size)
+        for attempt in range(self.retries):
+            try:
+                async with requests:
+                    with metrics.phase("http_request"):
+                        async with session.get(self.endpoint, params=params) as response:
+                            response.raise_for_status()
+                            payload = await response.json(content_type=None)
+                metrics.count("http_requests")
+                return payload
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                metrics.count("http_retries")
+                if attempt == self.retries - 1:
+                    raise RuntimeError(f"Page {page} failed after {self.retries} attempts: {str(e)}")
+                self.logger.log(f"Page {page} of {tuple(job)} failed ({str(e)}), retrying", "warning")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    @staticmethod
+    def parse_page(payload):
+        """Return (records, total) from one endpoint response."""
+        rows = network_capture.find_grid_rows(payload)
+        if rows is None:
+            if network_capture.find_total(payload) == 0:
+                return [], 0
+            raise ValueError("Response does not contain grid rows")
+        mapping = network_capture._column_map(rows[0])
+        return [network_capture.map_record(row, mapping) for row in rows], network_capture.find_total(payload)
+
@@ -0,0 +1,255 @@
+import itertools
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import util
+
+from logger import Logger
+from sinks import create_sink, output_exists, read_frame, write_frame
+from checkpoint import CheckpointStore
+from cache import ResultCache
+from metrics import merge_metrics, write_prometheus
+
+BatchJob = namedtuple("BatchJob", ["view_type", "period", "year", "region", "sub_region"])
+BatchJob.__new__.__defaults__ = ("Sve",)
+
+# Rough resident memory of one headless Chrome plus its driver while scraping
+MEMORY_PER_WORKER_MB = 600
+
+# Each worker process owns exactly one scraper, created lazily on its first job
+_worker_scraper = None
+_worker_options = {}
+_worker_output = ("output", "csv")
+_worker_cache = (None, False, False)
+_worker_log_level = "info"
+
+
+class JobResult:
+    """The outcome of one batch job: its output file and row count, or the error that stopped it."""
+
+    def __init__(self, job, output=None, rows=0, error=None, duration=0.0, metrics=None):
+        """Initialize the result for a job."""
+        self.job = job
+        self.output = output
+        self.rows = rows
+        self.error = error
+        self.duration = duration
+        self.metrics = metrics
+
+    @property
+    def ok(self):
+        """Return True if the job finished without an error."""
+        return self.error is None
+
+
+def build_jobs(view_types, periods, years, regions, sub_regions=("Sve",)):
+    """Build the cartesian product of filter values as a list of BatchJob tuples."""
+    return [BatchJob(*combo) for combo in itertools.product(view_types, periods, years, regions, sub_regions)]
+
+
+def available_memory_mb():
+    """Return the available system memory in MB, or None if it cannot be determined."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_worker_count(memory_per_worker_mb=MEMORY_PER_WORKER_MB):
+    """Return a worker count bounded by the CPU count and the available memory."""
+    workers = os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None:
+        workers = min(workers, memory // memory_per_worker_mb)
+    return max(1, workers)
+
+
+def job_filename(job, output_dir, output_format):
+    """Return the per-job output path, which is the same for every run of the job."""
+    parts = [job.region, job.sub_region, job.period, job.year, job.view_type]
+    name = "_".join(str(part).replace(" ", "-") for part in parts)
+    return os.path.join(output_dir, f"real_estate_data_{name}.{output_format}")
+
+
+def keeps_earlier_rows(job, output, checkpoints, incremental=False):
+    """Return True if the job's output file should be appended to rather than overwritten.
+
+    Incremental jobs merge new rows into the output of the previous run. Otherwise a checkpoint
+    means an earlier run of the job was interrupted, and its rows are kept; a checkpoint without
+    an output file to resume is cleared.
+    """
+    if incremental:
+        return output_exists(output)
+    if checkpoints.load(job) is not None and output_exists(output):
+        return True
+    checkpoints.clear(job)
+    return False
+
+
+def _init_worker(options, output, cache, log_level="info"):
+    """Store the scraper, output, cache/refresh options and log level for this worker process."""
+    global _worker_options, _worker_output, _worker_cache, _worker_log_level
+    _worker_options = options
+    _worker_output = output
+    _worker_cache = cache
+    _worker_log_level = log_level
+
+
+def _get_worker_scraper():
+    """Return this process's scraper; its browser session stays warm between jobs."""
+    global _worker_scraper
+    if _worker_scraper is None:
+        from scraper import RealEstateScraper
+        scraper = RealEstateScraper(Logger(level=_worker_log_level), **_worker_options)
+        # Quit the browser when the pool shuts the worker process down
+        util.Finalize(scraper, scraper.close, exitpriority=10)
+        _worker_scraper = scraper
+    return _worker_scraper
+
+
+def _run_job(job):
+    """Run a single job in a worker process and return its JobResult."""
+    start = time.time()
+    try:
+        scraper = _get_worker_scraper()
+        scraper.initialize_driver()
+        output_dir, output_format = _worker_output
+        output = job_filename(job, output_dir, output_format)
+        checkpoints = CheckpointStore(os.path.join(output_dir, "checkpoints"))
+        cache_path, force_refresh, incremental = _worker_cache
+        cache = ResultCache(cache_path) if cache_path else None
+        with create_sink(output, append=keeps_earlier_rows(job, output, checkpoints, incremental)) as sink:
+            rows = scraper.scrape_job(job, sink, cache=cache, force_refresh=force_refresh, checkpoints=checkpoints,
+                                      incremental=incremental)
+        scraper.finish_job(keep_page=True)
+        return JobResult(job, output=output, rows=rows, duration=time.time() - start,
+                         metrics=scraper.metrics.to_dict())
+    except Exception as e:
+        metrics = None
+        # The browser may be unusable after a failure, start a fresh one for the next job
+        if _worker_scraper is not None:
+            metrics = _worker_scraper.metrics.to_dict()
+            _worker_scraper.close()
+        return JobResult(job, error=str(e), duration=time.time() - start, metrics=metrics)
+
+
+class BatchScheduler:
+    """Run many filter combinations on a pool of worker processes, one browser each."""
+
+    def __init__(self, logger, workers=None, queue_size=None, headless=True,
+                 output_dir="output", output_format="csv", cache_path="cache/results.sqlite",
+                 force_refresh=False, incremental=False, log_level="info", **scraper_options):
+        """Initialize the scheduler with a logger, worker count, bounded queue size, per-job output
+        and result cache (cache_path=None disables it), and the log level of the worker processes.
+
+        With incremental=True each job only appends the rows its output file is missing.
+        """
+        self.logger = logger
+        self.workers = workers or default_worker_count()
+        self.queue_size = queue_size or self.workers * 2
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.cache_path = cache_path
+        self.force_refresh = force_refresh
+        self.incremental = incremental
+        self.log_level = log_level
+        self.scraper_options = dict(scraper_options, headless=headless)
+
+    def run(self, jobs):
+        """Run all jobs and return their JobResults in completion order."""
+        jobs = list(jobs)
+        results = []
+        pending = set()
+        self.logger.log(f"Starting batch of {len(jobs)} jobs on {self.workers} workers")
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.cache_path:
+            evicted = ResultCache(self.cache_path).evict()
+            if evicted:
+                self.logger.log(f"Evicted {evicted} stale cache entries")
+        initargs = (self.scraper_options, (self.output_dir, self.output_format),
+                    (self.cache_path, self.force_refresh, self.incremental), self.log_level)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=initargs) as executor:
+            job_iter = iter(jobs)
+            while True:
+                # Keep at most queue_size jobs submitted at any time
+                for job in itertools.islice(job_iter, self.queue_size - len(pending)):
+                    pending.add(executor.submit(_run_job, job))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results.append(result)
+                    self._log_result(result, len(results), len(jobs))
+        failed = sum(1 for result in results if not result.ok)
+        self.logger.log(f"Batch completed: {len(results) - failed} succeeded, {failed} failed")
+        return results
+
+    def _log_result(self, result, done, total):
+        """Log the outcome of a finished job."""
+        job = ", ".join(str(value) for value in result.job)
+        if result.ok:
+            self.logger.log(f"[{done}/{total}] Job ({job}) scraped {result.rows} rows in {result.duration:.2f} seconds")
+        else:
+            self.logger.log(f"[{done}/{total}] Job ({job}) failed: {result.error}", "error")
+
+    def write_metrics(self, results, filename, prometheus_filename=None, export_metrics=None):
+        """Write per-job and combined run metrics as JSON, and optionally as a Prometheus textfile.
+
+        export_metrics is the to_dict() summary of the exports done after the jobs, such as the
+        Excel conversions and the combined file; it is reported on its own and counted in the total.
+        """
+        summaries = [result.metrics for result in results if result.metrics]
+        total = merge_metrics(summaries + ([export_metrics] if export_metrics else []))
+        total["counters"]["jobs"] = len(results)
+        total["counters"]["failed_jobs"] = sum(1 for result in results if not result.ok)
+        report = {
+            "total": total,
+            "jobs": [{"job": result.job._asdict(), "ok": result.ok, "rows": result.rows,
+                      "duration": result.duration, "metrics": result.metrics} for result in results],
+        }
+        if export_metrics:
+            report["exports"] = export_metrics
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        if prometheus_filename:
+            write_prometheus(total, prometheus_filename, {"mode": "batch"})
+        self.logger.log(f"Run metrics written to {filename}")
+
+    def save_combined(self, results, filename, typed=False):
+        """Save the records of all successful jobs to one file with their filter columns.
+
+        The format follows the extension of filename (.xlsx, .csv, .jsonl, .parquet or .sqlite).
+        With typed=True the columns are normalized to numbers, dates and categories first.
+        """
+        frames = []
+        for result in results:
+            if result.ok and result.rows:
+                df = read_frame(result.output)
+                for field, value in zip(BatchJob._fields, result.job):
+                    df[field] = value
+                frames.append(df)
+        if not frames:
+            self.logger.log("No data to save", "warning")
+            return
+        import pandas as pd
+        combined = pd.concat(frames, ignore_index=True)
+        if typed:
+            from processing import log_unit_price_mismatches, normalize_frame
+            combined = normalize_frame(combined)
+            log_unit_price_mismatches(combined, self.logger)
+            for field in BatchJob._fields:
+                combined[field] = combined[field].astype("category")
+        self.logger.log(f"Saving {len(combined)} records from {len(frames)} jobs to {filename}")
+        write_frame(combined, filename)
+        self.logger.log("Data saved successfully")
@@ -0,0 +1,56 @@
+"""Compare bulk (single execute_script) and per-element row extraction on a local fixture page.
+
+Usage: python benchmarks/bench_extraction.py --rows 25 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger import Logger
+from scraper import RealEstateScraper
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "datagrid.html"
+
+
+def time_extraction(scraper, mode, repeat):
+    """Return the best wall time and the rows extracted by the given mode."""
+    scraper.extraction_mode = mode
+    best, rows = None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = scraper.extract_rows(page=1)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=25, help="rows rendered on the fixture page")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per mode, the best one is reported")
+    args = parser.parse_args()
+
+    scraper = RealEstateScraper(Logger(), headless=True)
+    try:
+        scraper.initialize_driver()
+        scraper.driver.get(f"{FIXTURE.as_uri()}?rows={args.rows}")
+
+        bulk_time, bulk_rows = time_extraction(scraper, "bulk", args.repeat)
+        element_time, element_rows = time_extraction(scraper, "element", args.repeat)
+
+        if bulk_rows != element_rows:
+            print("WARNING: bulk and per-element extraction returned different rows")
+        print(f"rows per page:      {len(bulk_rows)}")
+        print(f"bulk extraction:    {bulk_time * 1000:8.1f} ms")
+        print(f"element extraction: {element_time * 1000:8.1f} ms")
+        print(f"speedup:            {element_time / bulk_time:8.1f}x")
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare the memory of the scraped object-dtype frame with the normalized typed frame.
+
+Usage: python benchmarks/bench_processing.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+
+import pandas as pd
+
+import network_capture
+from processing import aggregate_by_location, normalize_frame, parse_numbers, unit_price_mismatches
+from mock_server import generate_row
+
+
+# Grid text and raw JSON numbers that parse_numbers must tell apart
+PARSE_CASES = [
+    ("50.000 €", 50000.0), ("1.234.567 €", 1234567.0), ("1.234 €", 1234.0), ("45 m²", 45.0),
+    ("45,5 m²", 45.5), ("1.045,25 m²", 1045.25), ("523.125", 523.125), ("45.5", 45.5), ("50000", 50000.0),
+    ("", math.nan),
+]
+
+
+def check_parse_cases():
+    """Return the PARSE_CASES that parse_numbers gets wrong as (text, expected, parsed)."""
+    parsed = parse_numbers(pd.Series([text for text, _ in PARSE_CASES]))
+    return [(text, expected, value) for (text, expected), value in zip(PARSE_CASES, parsed)
+            if not (value == expected or (math.isnan(expected) and math.isnan(value)))]
+
+
+def grid_text(record):
+    """Format a record the way the DataGrid shows it, e.g. "50.000 €" and "45 m²"."""
+    thousands = lambda value: f"{int(value):,}".replace(",", ".")
+    return dict(record, **{
+        "Cena": f"{thousands(record['Cena'])} €",
+        "Površina": f"{record['Površina']} m²",
+        "Cena/m²": f"{thousands(record['Cena/m²'])} €",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="rows in the generated frame")
+    args = parser.parse_args()
+
+    filters = {"period": "Februar", "year": "2019", "region": "Niš"}
+    records = [grid_text(network_capture.map_record(generate_row(i, filters))) for i in range(args.rows)]
+    raw = pd.DataFrame(records)
+
+    start = time.perf_counter()
+    typed = normalize_frame(raw)
+    elapsed = time.perf_counter() - start
+    mismatches = unit_price_mismatches(typed)
+    aggregates = aggregate_by_location(typed)
+
+    raw_mb = raw.memory_usage(deep=True).sum() / (1024 * 1024)
+    typed_mb = typed.memory_usage(deep=True).sum() / (1024 * 1024)
+    print(f"rows:              {len(raw)}")
+    print(f"object frame:      {raw_mb:8.1f} MB")
+    print(f"typed frame:       {typed_mb:8.1f} MB ({raw_mb / typed_mb:.1f}x smaller)")
+    print(f"normalize_frame:   {elapsed * 1000:8.1f} ms")
+    print(f"unparsed values:   {int(typed[['Cena', 'Površina', 'Cena/m²', 'Datum']].isna().sum().sum())}")
+    print(f"Cena/m² mismatches: {len(mismatches)}")
+    print(f"aggregate rows:    {len(aggregates)}")
+    wrong = check_parse_cases()
+    print(f"parse cases:       {len(PARSE_CASES) - len(wrong)}/{len(PARSE_CASES)} correct")
+    for text, expected, value in wrong:
+        print(f"  {text!r}: expected {expected}, got {value}")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
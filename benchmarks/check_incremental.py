@@ -0,0 +1,99 @@
+"""Refresh one job's output incrementally against the local stand-in site and check the merged rows.
+
+Usage: python benchmarks/check_incremental.py --rows 1000 --added 40 --format csv
+
+The steps share one output file, like hourly runs of the same job:
+full (no earlier output), grown (--added new transactions), unchanged, tampered (a stored row is
+edited, so the fingerprints no longer line up) and shrunk (the site reports fewer rows). After
+each step the file must hold exactly the rows the site serves; the pages read and whether the
+period was scraped again are reported.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import network_capture
+from batch import BatchJob, job_filename
+from logger import Logger
+from processing import parse_dates
+from scraper import COLUMNS, RealEstateScraper
+from sinks import create_sink, read_frame, write_frame
+from bench_processing import grid_text
+from mock_server import generate_row, start_server
+
+JOB = BatchJob("monthly", "Februar", "2019", "Niš", "Sve")
+
+
+def expected_rows(rows, mode):
+    """Return the rows the site serves for JOB as a Counter of column tuples."""
+    records = [network_capture.map_record(generate_row(i, JOB._asdict())) for i in range(rows)]
+    if mode != "network":
+        records = [grid_text(record) for record in records]
+    return Counter(tuple(record[column] for column in COLUMNS) for record in records)
+
+
+def stored_rows(path):
+    """Return the rows in the output file as a Counter of column tuples."""
+    return Counter(tuple(str(record[column]) for column in COLUMNS) for record in read_frame(path).to_dict("records"))
+
+
+def tamper(path):
+    """Change the price of the newest stored row, as if the site had corrected it."""
+    df = read_frame(path)
+    newest = parse_dates(df["Datum"]).idxmax()
+    df.loc[newest, "Cena"] = "1 €"
+    write_frame(df, path)
+
+
+def run_step(base_url, rows, mode, output):
+    """Scrape JOB incrementally into output and return (rows written, metrics summary, seconds)."""
+    scraper = RealEstateScraper(Logger(level="error"), headless=True, extraction_mode=mode,
+                                base_url=f"{base_url}/?rows={rows}")
+    start = time.perf_counter()
+    try:
+        scraper.initialize_driver()
+        with create_sink(output, append=os.path.exists(output)) as sink:
+            written = scraper.scrape_job(JOB, sink, incremental=True)
+        return written, scraper.metrics.to_dict(), time.perf_counter() - start
+    finally:
+        scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="rows the site serves at first")
+    parser.add_argument("--added", type=int, default=40, help="rows the site gains before the second run")
+    parser.add_argument("--mode", default="bulk", choices=["bulk", "network"])
+    parser.add_argument("--format", default="csv", choices=["csv", "jsonl", "sqlite", "parquet"])
+    args = parser.parse_args()
+
+    steps = [("full", args.rows, None), ("grown", args.rows + args.added, None),
+             ("unchanged", args.rows + args.added, None), ("tampered", args.rows + args.added, tamper),
+             ("shrunk", args.rows, None)]
+    server, base_url = start_server()
+    ok = True
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            output = job_filename(JOB, output_dir, args.format)
+            for name, rows, prepare in steps:
+                if prepare:
+                    prepare(output)
+                written, summary, elapsed = run_step(base_url, rows, args.mode, output)
+                matches = stored_rows(output) == expected_rows(rows, args.mode)
+                ok = ok and matches
+                counters = summary["counters"]
+                print(f"{name:10} site {rows:6} rows  wrote {written:6}  pages read {counters.get('pages', 0):3}  "
+                      f"{'full resync  ' if counters.get('full_resyncs') else ''}{elapsed:6.1f} s  "
+                      f"{'rows match' if matches else 'MISMATCH'}")
+    finally:
+        server.shutdown()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Scrape the JSON-backed fixture with network capture and with DOM extraction and compare them.
+
+Usage: python benchmarks/check_network_capture.py --rows 123
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger import Logger
+from scraper import RealEstateScraper
+from mock_server import start_server
+
+
+def scrape(base_url, rows, mode):
+    """Scrape every page of the fixture with the given extraction mode."""
+    scraper = RealEstateScraper(Logger(), headless=True, extraction_mode=mode)
+    try:
+        scraper.initialize_driver()
+        scraper.driver.get(f"{base_url}/grid_json.html?rows={rows}")
+        start = time.perf_counter()
+        records = scraper.scrape_data()
+        return records, time.perf_counter() - start
+    finally:
+        scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=123, help="total rows served by the mock endpoint")
+    args = parser.parse_args()
+
+    server, base_url = start_server()
+    try:
+        network_records, network_time = scrape(base_url, args.rows, "network")
+        dom_records, dom_time = scrape(base_url, args.rows, "bulk")
+    finally:
+        server.shutdown()
+
+    print(f"network capture: {len(network_records)} rows in {network_time:.2f} s")
+    print(f"DOM extraction:  {len(dom_records)} rows in {dom_time:.2f} s")
+    same_keys = [(r["Tip"], r["Datum"], r["Predmet"], r["Lokacija"]) for r in network_records] == \
+                [(r["Tip"], r["Datum"], r["Predmet"], r["Lokacija"]) for r in dom_records]
+    print("text columns match" if same_keys else "MISMATCH between network and DOM records")
+    return 0 if same_keys and len(network_records) == args.rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Local stand-in for cenenekretnina.rs: the site page, its data endpoint and the fixture pages.
+
+GET / serves fixtures/site.html, a stand-in for the whole site.
+GET /api/transactions?page=0&pageSize=25&rows=123&latency=0 returns one page of generated rows
+as JSON after `latency` milliseconds; the filter parameters (view_type, period, year, region,
+sub_region) shape the generated rows and sortField/sortOrder (asc or desc) sort them. Faults can be injected: a `fail` share of requests answers
+500, a `slow` share takes `slowms` milliseconds longer; `seed` makes the sequence repeatable.
+GET /assets/<name>?kb=N and /analytics/<name>?kb=N return N KB of filler with the content type of
+the extension, cacheable for a day, so the lean browser profile's savings can be measured.
+Every other path is served from benchmarks/fixtures.
+"""
+import json
+import random
+import threading
+import time
+from functools import lru_cache, partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+TYPES = ["Stan", "Kuća", "Garaža", "Poslovni prostor"]
+LABELS = ["Novogradnja", "Uknjižen", "Sa parkingom", "Terasa"]
+PLACES = ["Niš", "Medijana", "Palilula", "Pantelej", "Crveni krst"]
+MONTHS = ["Januar", "Februar", "Mart", "April", "Maj", "Jun", "Jul", "Avgust", "Septembar", "Oktobar",
+          "Novembar", "Decembar"]
+# Transactions are published in date order, so rows added later carry the latest dates
+ROWS_PER_DAY = 40
+CONTENT_TYPES = {".jpg": "image/jpeg", ".png": "image/png", ".woff2": "font/woff2",
+                 ".js": "application/javascript"}
+
+
+def period_month(filters, index):
+    """Return the month of a generated row for the requested period."""
+    period = filters.get("period", "Februar")
+    if period in MONTHS:
+        return MONTHS.index(period) + 1
+    if period.startswith("Q") and period[1:].isdigit():
+        return (int(period[1:]) - 1) * 3 + 1 + index % 3
+    return 2
+
+
+def generate_row(index, filters=None):
+    """Return the deterministic transaction with the given zero-based index for the given filters."""
+    filters = filters or {}
+    area = 30 + (index * 7) % 90
+    price = 40000 + (index * 1379) % 150000
+    places = PLACES
+    if filters.get("sub_region") not in (None, "Sve"):
+        places = [filters["sub_region"]]
+    elif filters.get("region"):
+        places = [filters["region"]] + PLACES[1:]
+    return {
+        "id": index + 1,
+        "tip": TYPES[index % len(TYPES)],
+        "datum": f"{1 + (index // ROWS_PER_DAY) % 28:02d}.{period_month(filters, index):02d}.{filters.get('year', '2019')}",
+        "cena": price,
+        "povrsina": area,
+        "cenaPoM2": round(price / area),
+        "predmet": [LABELS[(index + offset) % len(LABELS)] for offset in range(index % 3 + 1)],
+        "lokacija": places[index % len(places)],
+    }
+
+
+def sort_key(field):
+    """Return the sort key of a generated row for a column field; dates sort by year, month and day."""
+    if field == "datum":
+        return lambda row: row["datum"].split(".")[::-1]
+    return lambda row: row[field]
+
+
+@lru_cache(maxsize=32)
+def sorted_indices(total, filter_items, field, descending):
+    """Return the row indices of a filter combination in the order of the sorted column."""
+    filters = dict(filter_items)
+    key = sort_key(field)
+    return sorted(range(total), key=lambda index: key(generate_row(index, filters)), reverse=descending)
+
+
+class MockHandler(SimpleHTTPRequestHandler):
+    """Serve the fixture pages and the JSON data endpoint."""
+
+    # One random sequence per seed, shared by all requests, for the injected faults
+    fault_random = {}
+    fault_lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/api/transactions":
+            self.send_transactions(parse_qs(url.query))
+        elif url.path.startswith(("/assets/", "/analytics/")):
+            self.send_filler(url.path, parse_qs(url.query))
+        else:
+            if url.path == "/":
+                self.path = "/site.html"
+            super().do_GET()
+
+    def send_transactions(self, query):
+        """Write one page of transactions as JSON."""
+        value = lambda name, default: query.get(name, [default])[0]
+        total = int(value("rows", "123"))
+        page = int(value("page", "0"))
+        page_size = int(value("pageSize", "25"))
+        with self.fault_lock:
+            rng = self.fault_random.setdefault(value("seed", "1"), random.Random(value("seed", "1")))
+            failed = rng.random() < float(value("fail", "0"))
+            slowed = rng.random() < float(value("slow", "0"))
+        time.sleep((int(value("latency", "0")) + (int(value("slowms", "0")) if slowed else 0)) / 1000)
+        if failed:
+            self.send_error(500, "Injected failure")
+            return
+        filters = {name: value(name, None) for name in ("view_type", "period", "year", "region", "sub_region")}
+        filters = {name: filter_value for name, filter_value in filters.items() if filter_value is not None}
+        start = min(page * page_size, total)
+        stop = min(start + page_size, total)
+        indices = range(start, stop)
+        if value("sortField", None):
+            order = sorted_indices(total, tuple(sorted(filters.items())), value("sortField", None),
+                                   value("sortOrder", "asc") == "desc")
+            indices = order[start:stop]
+        body = json.dumps({
+            "data": {"items": [generate_row(i, filters) for i in indices]},
+            "totalCount": total,
+        }, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_filler(self, path, query):
+        """Write kb kilobytes of filler standing in for an image, font or script."""
+        size = int(query.get("kb", ["100"])[0]) * 1024
+        content_type = CONTENT_TYPES.get(Path(path).suffix, "application/octet-stream")
+        body = (b"/*" + b"x" * max(size - 4, 0) + b"*/") if content_type.endswith("javascript") else b"\0" * size
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0):
+    """Start the mock server in a background thread and return (server, base_url)."""
+    handler = partial(MockHandler, directory=str(FIXTURES))
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, base_url = start_server(8765)
+    print(f"Serving {FIXTURES} and /api/transactions on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
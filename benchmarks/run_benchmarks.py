@@ -0,0 +1,234 @@
+"""Run full scraping jobs headless against the local stand-in site and record comparable results.
+
+Usage:
+    python benchmarks/run_benchmarks.py --rows 100 1000 --latency 50 --modes bulk network
+    python benchmarks/run_benchmarks.py --profiles default lean
+    python benchmarks/run_benchmarks.py --consecutive 6
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<older-commit>.json
+
+Each scenario (row count × extraction mode × browser profile) runs --repeat jobs and reports the
+median wall time, rows/sec, WebDriver command count and bytes transferred, and the peak memory of
+the browser, its renderer and this process. With --consecutive N every run continues with the
+following months on the same browser and reports the filter setup time of those follow-up jobs.
+Results are written to benchmarks/results/<commit>.json so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import selenium
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from browser_profile import DEFAULT_BLOCKED_URLS
+from logger import Logger
+from scraper import RealEstateScraper
+from sinks import create_sink
+from mock_server import start_server
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+JOB = ("monthly", "Februar", "2019", "Niš", "Sve")
+MONTHS = ["Januar", "Februar", "Mart", "April", "Maj", "Jun", "Jul", "Avgust", "Septembar", "Oktobar",
+          "Novembar", "Decembar"]
+# The stand-in's analytics script is served locally, so block it by path
+LEAN_BLOCKED_URLS = DEFAULT_BLOCKED_URLS + ["*/analytics/*"]
+
+
+def git_commit():
+    """Return the short hash of the checked-out commit, or "unknown"."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class MemorySampler(threading.Thread):
+    """Sample the resident memory of the browser process tree in the background (requires psutil)."""
+
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = None
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            import psutil
+            root = psutil.Process(self.pid)
+        except Exception:
+            return
+        while not self.stopped.is_set():
+            try:
+                processes = [root] + root.children(recursive=True)
+                rss = sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+                self.peak_mb = max(self.peak_mb or 0.0, rss)
+            except Exception:
+                pass
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak_mb
+
+
+def setup_seconds(metrics):
+    """Return the time a job spent loading the site and setting its filters."""
+    return metrics.seconds("navigation") + metrics.seconds("filter")
+
+
+def run_job(base_url, mode, profile, output_dir, consecutive=1):
+    """Run one full job (driver start, filters, all pages, output) and return its measurements."""
+    lean = profile == "lean"
+    scraper = RealEstateScraper(Logger(level="warning"), headless=True, extraction_mode=mode, base_url=base_url,
+                                lean=lean, blocked_urls=LEAN_BLOCKED_URLS if lean else None)
+    tracemalloc.start()
+    start = time.perf_counter()
+    sampler = None
+    try:
+        scraper.initialize_driver()
+        sampler = MemorySampler(scraper.driver.service.process.pid)
+        sampler.start()
+        with create_sink(os.path.join(output_dir, f"{mode}.csv")) as sink:
+            rows = scraper.scrape_job(JOB, sink)
+        wall = time.perf_counter() - start
+        summary = scraper.metrics.to_dict()
+        first_setup = setup_seconds(scraper.metrics)
+        followup_setup = []
+        for index in range(1, consecutive):
+            scraper.finish_job(keep_page=True)
+            scraper.initialize_driver()
+            job = (JOB[0], MONTHS[(MONTHS.index(JOB[1]) + index) % 12]) + JOB[2:]
+            with create_sink(os.path.join(output_dir, f"{mode}-{index}.csv")) as sink:
+                scraper.scrape_job(job, sink)
+            followup_setup.append(setup_seconds(scraper.metrics))
+    finally:
+        browser_peak = sampler.stop() if sampler else None
+        python_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+        scraper.close()
+    return {
+        "wall_seconds": wall,
+        "rows": rows,
+        "rows_per_second": rows / wall if wall else 0.0,
+        "webdriver_commands": summary["counters"].get("webdriver_commands", 0),
+        "wait_seconds": summary["derived"]["wait_seconds"],
+        "bytes_transferred": summary["values"].get("bytes_transferred"),
+        "renderer_js_heap_used_mb": summary["values"].get("renderer_js_heap_used_mb"),
+        "peak_browser_mb": browser_peak,
+        "peak_python_mb": python_peak,
+        "phases": {name: phase["seconds"] for name, phase in summary["phases"].items()},
+        "setup_seconds": first_setup,
+        "followup_setup_seconds": median(followup_setup),
+    }
+
+
+def median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+def run_scenario(base_url, rows, latency, mode, profile, repeat, output_dir, consecutive=1):
+    """Run one scenario --repeat times and summarise it."""
+    url = f"{base_url}/?rows={rows}&latency={latency}"
+    runs = [run_job(url, mode, profile, output_dir, consecutive) for _ in range(repeat)]
+    name = f"{mode}-{rows}rows-{latency}ms" + ("-lean" if profile == "lean" else "")
+    return {
+        "name": name,
+        "mode": mode,
+        "profile": profile,
+        "rows": rows,
+        "latency_ms": latency,
+        "runs": runs,
+        "wall_seconds": median(run["wall_seconds"] for run in runs),
+        "rows_per_second": median(run["rows_per_second"] for run in runs),
+        "webdriver_commands": median(run["webdriver_commands"] for run in runs),
+        "bytes_transferred": median(run["bytes_transferred"] for run in runs),
+        "setup_seconds": median(run["setup_seconds"] for run in runs),
+        "followup_setup_seconds": median(run["followup_setup_seconds"] for run in runs),
+        "renderer_js_heap_used_mb": median(run["renderer_js_heap_used_mb"] for run in runs),
+        "peak_browser_mb": max((run["peak_browser_mb"] for run in runs if run["peak_browser_mb"]), default=None),
+        "peak_python_mb": max(run["peak_python_mb"] for run in runs),
+    }
+
+
+def compare(current, baseline):
+    """Print the change of every scenario metric against a baseline results file."""
+    previous = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    print(f"\nComparison with {baseline['commit']}:")
+    for scenario in current["scenarios"]:
+        old = previous.get(scenario["name"])
+        if not old:
+            continue
+        changes = []
+        for key in ("wall_seconds", "rows_per_second", "webdriver_commands", "bytes_transferred", "setup_seconds",
+                    "followup_setup_seconds", "peak_browser_mb"):
+            if scenario[key] and old.get(key):
+                changes.append(f"{key} {100.0 * (scenario[key] - old[key]) / old[key]:+.1f}%")
+        print(f"  {scenario['name']}: {', '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[123, 1000], help="rows per filter combination")
+    parser.add_argument("--latency", type=int, default=50, help="artificial latency per data request in ms")
+    parser.add_argument("--modes", nargs="+", default=["bulk"], choices=RealEstateScraper.EXTRACTION_MODES)
+    parser.add_argument("--profiles", nargs="+", default=["default"], choices=["default", "lean"],
+                        help="browser profiles to compare")
+    parser.add_argument("--consecutive", type=int, default=1,
+                        help="jobs per run on the same browser, for the following months")
+    parser.add_argument("--repeat", type=int, default=3, help="jobs per scenario, the median is reported")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            scenarios = [run_scenario(base_url, rows, args.latency, mode, profile, args.repeat, output_dir,
+                                      args.consecutive)
+                         for rows in args.rows for mode in args.modes for profile in args.profiles]
+    finally:
+        server.shutdown()
+
+    results = {
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "selenium": selenium.__version__,
+        "scenarios": scenarios,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    print(f"{'scenario':<33}{'wall s':>9}{'rows/s':>10}{'WD calls':>10}{'setup s':>9}{'next s':>8}"
+          f"{'KB in':>9}{'heap MB':>9}{'browser MB':>12}{'python MB':>11}")
+    for scenario in scenarios:
+        optional = lambda key, scale=1, spec=".0f": f"{scenario[key] / scale:{spec}}" if scenario[key] else "n/a"
+        print(f"{scenario['name']:<33}{scenario['wall_seconds']:>9.2f}{scenario['rows_per_second']:>10.1f}"
+              f"{scenario['webdriver_commands']:>10.0f}{scenario['setup_seconds']:>9.2f}"
+              f"{optional('followup_setup_seconds', spec='.2f'):>8}{optional('bytes_transferred', 1024):>9}"
+              f"{optional('renderer_js_heap_used_mb'):>9}{optional('peak_browser_mb'):>12}"
+              f"{scenario['peak_python_mb']:>11.1f}")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
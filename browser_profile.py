@@ -0,0 +1,179 @@
+import itertools
+import os
+from pathlib import Path
+from selenium import webdriver
+
+# URL patterns (Network.setBlockedURLs syntax, * is a wildcard) the lean profile never loads:
+# images, fonts, media and the usual analytics and ad hosts. The grid data is plain JSON.
+DEFAULT_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.*", "*hotjar.com*", "*clarity.ms*",
+]
+
+# Wide enough for all seven DataGrid columns, far smaller than a maximized window
+LEAN_WINDOW_SIZE = (1280, 900)
+DISK_CACHE_ROOT = Path.home() / ".cache" / "scrap" / "chrome-cache"
+DISK_CACHE_SIZE = 200 * 1024 * 1024
+
+LEAN_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--no-first-run",
+    "--mute-audio",
+    "--renderer-process-limit=2",
+    # Chrome only honours the last --disable-features, so everything goes in one flag
+    "--disable-features=Translate,MediaRouter,OptimizationHints,BackForwardCache,"
+    "IsolateOrigins,site-per-process",
+]
+
+TRANSFER_SIZE_JS = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+
+def build_options(headless=False, lean=False, cache_dir=None):
+    """Return ChromeOptions for the scraper, optionally with the lean profile.
+
+    The lean profile uses the eager page-load strategy, a fixed window size, memory-saving flags,
+    no images and a disk cache in cache_dir that is kept between runs.
+    """
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    if lean:
+        options.page_load_strategy = 'eager'
+        options.add_argument(f'--window-size={LEAN_WINDOW_SIZE[0]},{LEAN_WINDOW_SIZE[1]}')
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        if cache_dir:
+            options.add_argument(f'--disk-cache-dir={cache_dir}')
+            options.add_argument(f'--disk-cache-size={DISK_CACHE_SIZE}')
+    else:
+        options.add_argument('--start-maximized')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    return options
+
+
+def _process_alive(pid):
+    """Return True if a process with pid is running, or if that cannot be told."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_lock(lock_file):
+    """Return the PID stored in lock_file, or 0 if it cannot be read."""
+    try:
+        return int(Path(lock_file).read_text())
+    except (OSError, ValueError):
+        return 0
+
+
+def _create_lock(lock_file):
+    """Create lock_file holding this process's PID; return False if it already exists.
+
+    The PID is written to a private file that is then hard-linked into place, so the lock file
+    never exists without its PID.
+    """
+    temp_file = lock_file.with_name(f"{lock_file.name}.{os.getpid()}.tmp")
+    temp_file.write_text(str(os.getpid()))
+    try:
+        os.link(temp_file, lock_file)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+
+def _remove_stale_lock(lock_file, pid):
+    """Remove lock_file if it still belongs to the dead process pid."""
+    stale_file = lock_file.with_name(f"{lock_file.name}.{os.getpid()}.stale")
+    try:
+        os.rename(lock_file, stale_file)
+    except FileNotFoundError:
+        return
+    # Another scraper may have reclaimed the slot between reading the PID and the rename
+    if _read_lock(stale_file) != pid:
+        try:
+            os.link(stale_file, lock_file)
+        except FileExistsError:
+            pass
+    stale_file.unlink(missing_ok=True)
+
+
+def claim_cache_dir(root=DISK_CACHE_ROOT):
+    """Return (directory, lock_file) for a disk cache slot under root that no running scraper uses.
+
+    Chrome must not share a disk cache between running browsers, so each scraper claims the lowest
+    free slot; a slot keeps its cache after the scraper exits and is reused by the next run.
+    """
+    for slot in itertools.count():
+        directory = Path(root) / f"slot-{slot}"
+        lock_file = directory / "scraper.lock"
+        directory.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            if _create_lock(lock_file):
+                return directory, lock_file
+            pid = _read_lock(lock_file)
+            # A lock that cannot be read is treated as held rather than guessed stale
+            if not pid or _process_alive(pid):
+                break
+            # Left behind by a scraper that did not exit cleanly
+            _remove_stale_lock(lock_file, pid)
+
+
+def release_cache_dir(lock_file):
+    """Give a claimed disk cache slot back."""
+    try:
+        Path(lock_file).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def apply_block_rules(driver, patterns):
+    """Make the browser refuse requests to URLs matching any of patterns."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def transferred_bytes(driver):
+    """Return the bytes transferred over the network by the current page, as seen by resource timing.
+
+    Cache hits count as 0 and cross-origin responses without Timing-Allow-Origin are not included.
+    """
+    return driver.execute_script(TRANSFER_SIZE_JS) or 0
+
+
+def renderer_memory(driver):
+    """Return {metric: value} with the JS heap (MB) and DOM size of the current renderer."""
+    driver.execute_cdp_cmd("Performance.enable", {})
+    metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    return {
+        "renderer_js_heap_used_mb": metrics.get("JSHeapUsedSize", 0) / (1024 * 1024),
+        "renderer_js_heap_total_mb": metrics.get("JSHeapTotalSize", 0) / (1024 * 1024),
+        "renderer_dom_nodes": metrics.get("Nodes", 0),
+    }
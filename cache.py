@@ -0,0 +1,185 @@
+import hashlib
+import json
+import sqlite3
+import time
+from datetime import date
+from pathlib import Path
+
+from checkpoint import filters_key, row_fingerprint
+from sinks import OutputSink
+
+MONTHS = ["Januar", "Februar", "Mart", "April", "Maj", "Jun", "Jul", "Avgust", "Septembar", "Oktobar", "Novembar", "Decembar"]
+QUARTERS = ["Q1", "Q2", "Q3", "Q4"]
+
+# Transactions are registered with a delay, so a period stays "open" this long after it ends
+OPEN_PERIOD_GRACE_DAYS = 90
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    view_type TEXT, period TEXT, year TEXT, region TEXT, sub_region TEXT,
+    reported_total INTEGER, row_count INTEGER, fingerprint TEXT,
+    created_at REAL, accessed_at REAL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    key TEXT, position INTEGER, record TEXT,
+    PRIMARY KEY (key, position)
+);
+"""
+
+
+def period_end(view_type, period, year):
+    """Return the last day of a monthly or quarterly period, or None if it is not recognised."""
+    year = int(year)
+    if view_type == "monthly" and period in MONTHS:
+        month = MONTHS.index(period) + 1
+    elif period in QUARTERS:
+        month = (QUARTERS.index(period) + 1) * 3
+    else:
+        return None
+    if month == 12:
+        return date(year, 12, 31)
+    return date.fromordinal(date(year, month + 1, 1).toordinal() - 1)
+
+
+def is_open_period(view_type, period, year, today=None):
+    """Return True if a period may still receive new transactions."""
+    end = period_end(view_type, period, year)
+    if end is None:
+        return True
+    today = today or date.today()
+    return (today - end).days <= OPEN_PERIOD_GRACE_DAYS
+
+
+def content_fingerprint(fingerprints):
+    """Combine per-row fingerprints into one fingerprint for the whole result."""
+    digest = hashlib.sha1()
+    for fingerprint in fingerprints:
+        digest.update(fingerprint.encode("ascii"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Persistent SQLite cache of scraped records keyed by (view_type, period, year, region, sub_region).
+
+    An entry is served while the total the site reports is unchanged. Entries for open periods
+    are refreshed after open_period_ttl seconds; any entry is dropped after max_age seconds or
+    when the cache holds more than max_entries (least recently used first).
+    """
+
+    def __init__(self, path="cache/results.sqlite", open_period_ttl=6 * 3600,
+                 max_age=180 * 24 * 3600, max_entries=5000):
+        """Initialize the cache at path with its refresh and eviction policy."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.open_period_ttl = open_period_ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, filters, reported_total):
+        """Return the cached records for filters, or None if there is no fresh, matching entry."""
+        key = filters_key(filters)
+        with self._connect() as connection:
+            entry = connection.execute(
+                "SELECT reported_total, row_count, fingerprint, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if entry is None:
+                return None
+            cached_total, row_count, fingerprint, created_at = entry
+            if cached_total != reported_total or self._expired(filters, created_at):
+                return None
+            records = [json.loads(record) for (record,) in connection.execute(
+                "SELECT record FROM rows WHERE key = ? ORDER BY position", (key,))]
+            if len(records) != row_count or content_fingerprint(map(row_fingerprint, records)) != fingerprint:
+                return None
+            connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return records
+
+    def _expired(self, filters, created_at):
+        """Return True if an entry created at created_at must be refreshed."""
+        age = time.time() - created_at
+        if age > self.max_age:
+            return True
+        view_type, period, year = filters[0], filters[1], filters[2]
+        return is_open_period(view_type, period, year) and age > self.open_period_ttl
+
+    def writer(self, filters, reported_total):
+        """Return a sink that stores records for filters; call commit() once the job is complete."""
+        return CacheWriter(self, filters, reported_total)
+
+    def invalidate(self, filters):
+        """Remove the entry for filters."""
+        key = filters_key(filters)
+        with self._connect() as connection:
+            connection.execute("DELETE FROM rows WHERE key = ?", (key,))
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self):
+        """Drop entries older than max_age and the least recently used ones above max_entries."""
+        with self._connect() as connection:
+            stale = [key for (key,) in connection.execute(
+                "SELECT key FROM entries WHERE created_at < ?", (time.time() - self.max_age,))]
+            stale += [key for (key,) in connection.execute(
+                "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?", (self.max_entries,))]
+            for key in set(stale):
+                connection.execute("DELETE FROM rows WHERE key = ?", (key,))
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        return len(set(stale))
+
+
+class CacheWriter(OutputSink):
+    """A sink that stages records for one cache entry while they are scraped."""
+
+    def __init__(self, cache, filters, reported_total):
+        """Initialize the writer for the entry of filters."""
+        super().__init__(cache.path, append=False)
+        self.cache = cache
+        self.filters = list(filters)
+        self.key = filters_key(filters)
+        self.reported_total = reported_total
+        self.fingerprints = []
+
+    def open(self):
+        self.connection = self.cache._connect()
+        self.connection.execute("DELETE FROM rows WHERE key = ?", (self.key,))
+        self.connection.execute("DELETE FROM entries WHERE key = ?", (self.key,))
+        self.connection.commit()
+
+    def _write(self, records):
+        start = len(self.fingerprints)
+        self.connection.executemany(
+            "INSERT INTO rows (key, position, record) VALUES (?, ?, ?)",
+            [(self.key, start + i, json.dumps(record, ensure_ascii=False)) for i, record in enumerate(records)],
+        )
+        self.connection.commit()
+        self.fingerprints.extend(row_fingerprint(record) for record in records)
+
+    def reset(self):
+        super().reset()
+        self.fingerprints = []
+        self.connection.execute("DELETE FROM rows WHERE key = ?", (self.key,))
+        self.connection.commit()
+
+    def commit(self):
+        """Publish the entry if it holds exactly the number of rows the site reported."""
+        if self.rows_written != self.reported_total:
+            self.connection.execute("DELETE FROM rows WHERE key = ?", (self.key,))
+            self.connection.commit()
+            return False
+        now = time.time()
+        view_type, period, year, region, sub_region = (self.filters + [None] * 5)[:5]
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.key, view_type, period, str(year), region, sub_region, self.reported_total,
+             self.rows_written, content_fingerprint(self.fingerprints), now, now),
+        )
+        self.connection.commit()
+        return True
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+
+Checkpoint = namedtuple("Checkpoint", ["filters", "page", "row_count", "last_row_hash", "failed_pages", "updated_at"])
+
+
+def row_fingerprint(record):
+    """Return a stable hash of a scraped record, independent of its column order."""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def filters_key(filters):
+    """Return a short stable key for a filter tuple or dict."""
+    if isinstance(filters, dict):
+        filters = [filters[key] for key in sorted(filters)]
+    payload = json.dumps([str(value) for value in filters], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CheckpointStore:
+    """Persist the last completed page of each job so an interrupted job can resume."""
+
+    def __init__(self, directory="checkpoints"):
+        """Initialize the store with the directory holding one JSON file per job."""
+        self.directory = Path(directory)
+
+    def path(self, filters):
+        """Return the checkpoint file for a filter tuple."""
+        return self.directory / f"{filters_key(filters)}.json"
+
+    def load(self, filters):
+        """Return the checkpoint for filters, or None if there is none."""
+        try:
+            data = json.loads(self.path(filters).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        checkpoint = Checkpoint(**data)
+        if [str(value) for value in checkpoint.filters] != [str(value) for value in filters]:
+            return None
+        return checkpoint
+
+    def save(self, filters, page, row_count, last_row_hash, failed_pages=()):
+        """Atomically write the checkpoint for a completed page."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        checkpoint = Checkpoint(list(filters), page, row_count, last_row_hash, list(failed_pages), time.time())
+        path = self.path(filters)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(checkpoint._asdict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return checkpoint
+
+    def clear(self, filters):
+        """Remove the checkpoint for filters once the job has finished."""
+        try:
+            self.path(filters).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,371 @@
+"""Headless command-line entry point for scheduled and server-side runs.
+
+Examples:
+    python cli.py --view-type monthly --period Februar --year 2019 --region Niš
+    python cli.py --jobs jobs.yaml --workers 4 --combined output/all.xlsx
+
+A job spec file (JSON, or YAML when PyYAML is installed) is either a list of jobs or a mapping with
+"jobs" and/or "matrix" entries plus any of the command-line options as defaults:
+
+    {"matrix": {"view_types": ["monthly"], "periods": ["Januar", "Februar"], "years": ["2019"],
+                "regions": ["Niš"]},
+     "format": "parquet", "workers": 2}
+
+Each job's output file is named after its filters and keeps that name between runs, so a job
+that was interrupted resumes after its last checkpointed page when it is run again. With
+--incremental only the transactions added since the previous run are appended to it, which suits
+hourly refreshes of an open period.
+
+With --backend http the jobs are fetched from the site's data endpoint without a browser, and
+jobs that fail there are retried with Selenium unless --no-fallback is given. The endpoint is not
+built in: pass the URL the grid requests (see the browser's network tab) with --endpoint, and map
+the filter, page and page size fields to its query parameters with --endpoint-param, e.g.
+--endpoint-param region=opstina --endpoint-param page_size=limit.
+
+Only the standard library is imported until the arguments are parsed; Selenium is loaded when
+the first job starts and pandas only for Excel or combined output. tkinter is never imported.
+"""
+import time
+
+STARTED_AT = time.time()
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from logger import Logger
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+EXIT_INTERRUPTED = 130
+
+OPTION_DEFAULTS = {
+    "output_dir": "output",
+    "format": "csv",
+    "excel": False,
+    "typed": False,
+    "workers": None,
+    "extraction_mode": "bulk",
+    "lean": False,
+    "cache": "cache/results.sqlite",
+    "no_cache": False,
+    "force_refresh": False,
+    "incremental": False,
+    "combined": None,
+    "prometheus": None,
+    "log_level": "info",
+    "backend": "selenium",
+    "endpoint": None,
+    "endpoint_params": None,
+    "concurrency": 8,
+    "no_fallback": False,
+}
+
+
+class JobSpecError(ValueError):
+    """Raised when the job spec file or filter arguments are invalid."""
+
+
+def load_spec(path):
+    """Read a JSON or YAML job spec file."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise JobSpecError("Reading YAML job specs requires PyYAML (pip install pyyaml), or use JSON")
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise JobSpecError(f"{path}: invalid YAML: {str(e)}")
+    else:
+        spec = json.loads(text)
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    if not isinstance(spec, dict):
+        raise JobSpecError(f"{path}: expected a list of jobs or a mapping")
+    return spec
+
+
+def jobs_from_spec(spec):
+    """Return the (view_type, period, year, region, sub_region) tuples described by a spec."""
+    from batch import BatchJob, build_jobs
+
+    jobs = []
+    entries = spec.get("jobs", [])
+    if not isinstance(entries, list):
+        raise JobSpecError("\"jobs\" must be a list of job mappings")
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise JobSpecError(f"Invalid job {entry!r}: expected a mapping of filter names to values")
+        try:
+            jobs.append(BatchJob(**{key: str(value) for key, value in entry.items()}))
+        except TypeError as e:
+            raise JobSpecError(f"Invalid job {entry}: {str(e)}")
+    matrix = spec.get("matrix")
+    if matrix:
+        if not isinstance(matrix, dict):
+            raise JobSpecError("\"matrix\" must be a mapping of filter lists")
+        try:
+            axes = [matrix[key] for key in ("view_types", "periods", "years", "regions")]
+        except KeyError as e:
+            raise JobSpecError(f"Job matrix is missing {e}")
+        axes.append(matrix.get("sub_regions", ("Sve",)))
+        for key, values in zip(("view_types", "periods", "years", "regions", "sub_regions"), axes):
+            if not isinstance(values, (list, tuple)):
+                raise JobSpecError(f"Job matrix entry {key!r} must be a list, got {values!r}")
+        jobs += build_jobs(*[[str(value) for value in values] for values in axes])
+    for job in jobs:
+        if job.view_type not in ("monthly", "quarterly"):
+            raise JobSpecError(f"Invalid view type {job.view_type!r} (expected monthly or quarterly)")
+    return jobs
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments; options default to None so a spec file can provide them."""
+    parser = argparse.ArgumentParser(description="Scrape cenenekretnina.rs headless, without the GUI.")
+    job = parser.add_argument_group("single job")
+    job.add_argument("--view-type", choices=("monthly", "quarterly"), default="monthly")
+    job.add_argument("--period", help="month or quarter as shown on the site, e.g. Februar or Q1")
+    job.add_argument("--year")
+    job.add_argument("--region")
+    job.add_argument("--sub-region", default="Sve")
+    parser.add_argument("--jobs", metavar="SPEC", help="JSON or YAML job spec file")
+    parser.add_argument("--output-dir", help="directory for result and metrics files (default: output)")
+    parser.add_argument("--format", choices=("csv", "jsonl", "sqlite", "parquet"), help="output format (default: csv)")
+    parser.add_argument("--excel", action="store_true", default=None, help="also convert each result to .xlsx")
+    parser.add_argument("--typed", action="store_true", default=None,
+                        help="write Excel and combined output with numeric, date and categorical columns")
+    parser.add_argument("--combined", help="save all successful jobs to one file (.xlsx, .csv, .jsonl, .parquet or .sqlite)")
+    parser.add_argument("--workers", type=int, help="browser processes for multi-job runs (default: by CPU and memory)")
+    parser.add_argument("--extraction-mode", choices=("bulk", "element", "network"))
+    parser.add_argument("--lean", action="store_true", default=None,
+                        help="lean browser profile: block images, fonts and trackers, eager page loads")
+    parser.add_argument("--cache", help="result cache file (default: cache/results.sqlite)")
+    parser.add_argument("--no-cache", action="store_true", default=None, help="do not read or write the result cache")
+    parser.add_argument("--force-refresh", action="store_true", default=None, help="scrape even when the cache has the result")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="append only the rows added since the last run to each job's output file "
+                             "(Selenium backend only)")
+    parser.add_argument("--prometheus", help="also write metrics in the Prometheus textfile format to this path")
+    parser.add_argument("--log-level", choices=("debug", "info", "warning", "error"))
+    http = parser.add_argument_group("browserless backend")
+    http.add_argument("--backend", choices=("selenium", "http"), help="scrape through Chrome (default) or "
+                      "by calling the site's data endpoint directly (requires aiohttp)")
+    http.add_argument("--endpoint", help="data endpoint URL, required by the http backend")
+    http.add_argument("--endpoint-param", dest="endpoint_params", action="append", metavar="FIELD=NAME",
+                      help="query parameter the endpoint uses for a job field (view_type, period, year, region, "
+                           "sub_region, page or page_size); repeatable, defaults to the field name")
+    http.add_argument("--concurrency", type=int, help="maximum concurrent requests of the http backend (default: 8)")
+    http.add_argument("--no-fallback", action="store_true", default=None,
+                      help="do not retry jobs that failed on the http backend with Selenium")
+    args = parser.parse_args(argv)
+    if not args.jobs and not (args.period and args.year and args.region):
+        parser.error("either --jobs or all of --period, --year and --region are required")
+    return args
+
+
+def resolve_options(args, spec):
+    """Merge command-line options over spec options over the defaults."""
+    options = {}
+    for name, default in OPTION_DEFAULTS.items():
+        value = getattr(args, name)
+        options[name] = value if value is not None else spec.get(name, default)
+    if options["backend"] == "http":
+        if not options["endpoint"]:
+            raise JobSpecError("The http backend requires --endpoint: the site's data endpoint URL")
+        options["endpoint_params"] = parse_endpoint_params(options["endpoint_params"])
+    return argparse.Namespace(**options)
+
+
+def parse_endpoint_params(value):
+    """Return the field to query parameter mapping from FIELD=NAME strings or a spec mapping."""
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        mapping = dict(value)
+    else:
+        try:
+            mapping = dict(item.split("=", 1) for item in value)
+        except ValueError:
+            raise JobSpecError("Endpoint parameters must be given as FIELD=NAME")
+    fields = ("view_type", "period", "year", "region", "sub_region", "page", "page_size")
+    unknown = [field for field in mapping if field not in fields]
+    if unknown:
+        raise JobSpecError(f"Unknown endpoint parameter field(s) {', '.join(unknown)} "
+                           f"(expected {', '.join(fields)})")
+    return {field: str(name) for field, name in mapping.items()}
+
+
+def run_single(job, options, logger):
+    """Scrape one job in this process and return its exit code."""
+    from scraper import RealEstateScraper
+    from batch import job_filename, keeps_earlier_rows
+    from cache import ResultCache
+    from checkpoint import CheckpointStore
+    from sinks import create_sink
+
+    scraper = RealEstateScraper(logger, headless=True, extraction_mode=options.extraction_mode, lean=options.lean)
+    try:
+        scraper.initialize_driver()
+        os.makedirs(options.output_dir, exist_ok=True)
+        # The same file on every run, so an interrupted job can resume and new rows can be merged into it
+        output = job_filename(job, options.output_dir, options.format)
+        basename = os.path.splitext(output)[0]
+        checkpoints = CheckpointStore(os.path.join(options.output_dir, "checkpoints"))
+        append = keeps_earlier_rows(job, output, checkpoints, options.incremental)
+        cache = None if options.no_cache else ResultCache(options.cache)
+        with create_sink(output, append=append) as sink:
+            rows = scraper.scrape_job(job, sink, cache=cache, force_refresh=options.force_refresh,
+                                      checkpoints=checkpoints, incremental=options.incremental)
+        if options.excel and rows:
+            scraper.export_to_excel(sink.path, f"{basename}.xlsx", typed=options.typed)
+        if options.combined and rows:
+            from sinks import read_frame, write_frame
+            with scraper.metrics.phase("export:combined"):
+                df = read_frame(sink.path)
+                if options.typed:
+                    from processing import log_unit_price_mismatches, normalize_frame
+                    df = normalize_frame(df)
+                    log_unit_price_mismatches(df, logger)
+                write_frame(df, options.combined)
+        first_navigation = scraper.metrics.values.get("first_navigation_at")
+        if first_navigation:
+            scraper.metrics.set("startup_to_first_navigation_seconds", first_navigation - STARTED_AT)
+            logger.log(f"Import to first navigation: {first_navigation - STARTED_AT:.2f} seconds")
+        scraper.metrics.write_json(f"{basename}_metrics.json")
+        if options.prometheus:
+            scraper.metrics.write_prometheus(options.prometheus, {"mode": "cli"})
+        logger.log(f"Scraped {rows} rows into {sink.path}")
+        return EXIT_OK
+    except Exception as e:
+        logger.log(f"Job failed: {str(e)}", "error")
+        return EXIT_FAILED
+    finally:
+        scraper.close()
+
+
+def run_batch(jobs, options, logger):
+    """Scrape several jobs on a worker pool and return the exit code."""
+    from batch import BatchScheduler
+
+    scheduler = BatchScheduler(logger, workers=options.workers, output_dir=options.output_dir,
+                               output_format=options.format,
+                               cache_path=None if options.no_cache else options.cache,
+                               force_refresh=options.force_refresh, extraction_mode=options.extraction_mode,
+                               lean=options.lean, incremental=options.incremental, log_level=options.log_level)
+    results = scheduler.run(jobs)
+    finish_outputs(scheduler, results, options)
+    return exit_code(sum(1 for result in results if not result.ok), len(results))
+
+
+def run_http(jobs, options, logger):
+    """Scrape jobs through the site's data endpoint and return the jobs that failed."""
+    from backends import HttpBackend
+    from batch import BatchScheduler, job_filename
+    from cache import ResultCache
+    from sinks import create_sink
+
+    try:
+        params = dict(options.endpoint_params)
+        backend = HttpBackend(logger, options.endpoint, concurrency=options.concurrency,
+                              page_param=params.pop("page", "page"),
+                              page_size_param=params.pop("page_size", "pageSize"), params=params)
+    except ImportError as e:
+        logger.log(str(e), "warning")
+        return jobs
+    os.makedirs(options.output_dir, exist_ok=True)
+    cache = None if options.no_cache else ResultCache(options.cache)
+    results = backend.scrape_jobs(jobs, lambda job: create_sink(job_filename(job, options.output_dir, options.format)),
+                                  cache=cache, force_refresh=options.force_refresh)
+    # The scheduler is only used for its reporting here, it starts no workers
+    scheduler = BatchScheduler(logger, workers=1, output_dir=options.output_dir)
+    finish_outputs(scheduler, results, options)
+    return [result.job for result in results if not result.ok]
+
+
+def run_selenium(jobs, options, logger):
+    """Scrape jobs in Chrome, in this process for a single job, and return the exit code."""
+    if len(jobs) == 1:
+        return run_single(jobs[0], options, logger)
+    return run_batch(jobs, options, logger)
+
+
+def finish_outputs(scheduler, results, options):
+    """Write the optional Excel and combined files of a multi-job run, then its metrics."""
+    from metrics import RunMetrics
+
+    export_metrics = RunMetrics()
+    if options.excel:
+        from sinks import convert_to_excel
+        for result in results:
+            if result.ok and result.rows:
+                with export_metrics.phase("export"):
+                    convert_to_excel(result.output, os.path.splitext(result.output)[0] + ".xlsx",
+                                     typed=options.typed, logger=scheduler.logger)
+    if options.combined:
+        with export_metrics.phase("export:combined"):
+            scheduler.save_combined(results, options.combined, typed=options.typed)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    scheduler.write_metrics(results, os.path.join(options.output_dir, f"batch_metrics_{timestamp}.json"),
+                            options.prometheus, export_metrics=export_metrics.to_dict())
+
+
+def exit_code(failed, total):
+    """Return the exit code for a run in which failed of total jobs failed."""
+    if failed == 0:
+        return EXIT_OK
+    return EXIT_FAILED if failed == total else EXIT_PARTIAL
+
+
+def main(argv=None):
+    """Run the jobs given on the command line or in a spec file and return the process exit code."""
+    args = parse_args(argv)
+    try:
+        spec = load_spec(args.jobs) if args.jobs else {}
+        options = resolve_options(args, spec)
+        if args.jobs:
+            jobs = jobs_from_spec(spec)
+        else:
+            from batch import BatchJob
+            jobs = [BatchJob(args.view_type, args.period, args.year, args.region, args.sub_region)]
+    except (OSError, ValueError) as e:
+        print(f"Invalid job spec: {str(e)}", file=sys.stderr)
+        return EXIT_USAGE
+    if not jobs:
+        print("Job spec contains no jobs", file=sys.stderr)
+        return EXIT_USAGE
+
+    logger = Logger(level=options.log_level)
+    logger.start_timer()
+    try:
+        if options.backend == "http" and options.incremental:
+            logger.log("Incremental updates need the grid's sorting, using the Selenium backend", "warning")
+            code = run_selenium(jobs, options, logger)
+        elif options.backend == "http":
+            failed = run_http(jobs, options, logger)
+            if not failed or options.no_fallback:
+                code = exit_code(len(failed), len(jobs))
+            else:
+                logger.log(f"Falling back to Selenium for {len(failed)} jobs", "warning")
+                code = run_selenium(failed, options, logger)
+                if code == EXIT_FAILED and len(failed) < len(jobs):
+                    code = EXIT_PARTIAL
+        else:
+            code = run_selenium(jobs, options, logger)
+    except KeyboardInterrupt:
+        logger.log("Interrupted, finished pages are checkpointed", "warning")
+        code = EXIT_INTERRUPTED
+    finally:
+        logger.end_timer()
+        logger.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
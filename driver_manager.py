@@ -0,0 +1,166 @@
+import json
+import os
+import time
+from pathlib import Path
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+DRIVER_CACHE_FILE = Path.home() / ".cache" / "scrap" / "chromedriver.json"
+DRIVER_CACHE_TTL = 7 * 24 * 3600
+
+CLEAR_STORAGE_JS = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+def resolve_chromedriver(logger, cache_file=DRIVER_CACHE_FILE, ttl=DRIVER_CACHE_TTL, refresh=False):
+    """Return the chromedriver path, resolving it with webdriver-manager at most once per TTL.
+
+    A stale cached path is still used when the lookup fails, so the scraper works offline
+    after the first successful run. refresh=True looks the driver up again even when the cached
+    path is recent, e.g. after Chrome was updated and no longer accepts the cached driver.
+    """
+    cache_file = Path(cache_file)
+    cached = None
+    try:
+        cached = json.loads(cache_file.read_text())
+        if not os.path.exists(cached["path"]):
+            cached = None
+    except (OSError, ValueError, KeyError, TypeError):
+        cached = None
+
+    if cached and not refresh and time.time() - cached["resolved_at"] < ttl:
+        logger.log(f"Using cached chromedriver: {cached['path']}")
+        return cached["path"]
+
+    try:
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        if cached:
+            logger.log(f"Could not resolve chromedriver ({str(e)}), using cached {cached['path']}", "warning")
+            return cached["path"]
+        raise
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"path": path, "resolved_at": time.time()}))
+    except OSError as e:
+        logger.log(f"Could not write chromedriver cache {cache_file}: {str(e)}", "warning")
+    return path
+
+
+class DriverSession:
+    """A warm Chrome session that is reset between jobs and recycled when it gets old or large."""
+
+    def __init__(self, options, logger, max_jobs=25, max_memory_mb=1024, metrics=None):
+        """Initialize the session with Chrome options, a logger, recycling limits and optional RunMetrics."""
+        self.options = options
+        self.logger = logger
+        self.metrics = metrics
+        self.max_jobs = max_jobs
+        self.max_memory_mb = max_memory_mb
+        self.driver = None
+        self.jobs = 0
+        self.psutil_warned = False
+
+    def start(self):
+        """Start a new Chrome instance."""
+        self.logger.log("Starting Chrome session...")
+        start = time.perf_counter()
+        path = resolve_chromedriver(self.logger)
+        resolved = time.perf_counter()
+        try:
+            self.driver = webdriver.Chrome(service=Service(path), options=self.options)
+        except SessionNotCreatedException as e:
+            # The cached driver no longer matches the installed Chrome version
+            self.logger.log(f"Chrome rejected chromedriver {path}, resolving it again: {str(e).strip()}", "warning")
+            refreshed = resolve_chromedriver(self.logger, refresh=True)
+            if refreshed == path:
+                raise
+            resolved = time.perf_counter()
+            self.driver = webdriver.Chrome(service=Service(refreshed), options=self.options)
+        if self.metrics is not None:
+            self.metrics.add("driver_resolve", resolved - start)
+            self.metrics.add("browser_start", time.perf_counter() - resolved)
+        self.jobs = 0
+        self.logger.log("Chrome session started")
+
+    def acquire(self):
+        """Return a ready driver, starting or recycling the browser when needed."""
+        if self.driver is None:
+            self.start()
+        elif self.needs_recycle():
+            self.recycle()
+        return self.driver
+
+    def release(self, reset=True):
+        """Mark the current job as finished and, unless reset is False, reset the browser for the next one."""
+        self.jobs += 1
+        if not reset:
+            return
+        try:
+            self.reset()
+        except Exception as e:
+            self.logger.log(f"Failed to reset browser, it will be recycled: {str(e)}", "warning")
+            self.close()
+
+    def reset(self):
+        """Clear cookies and web storage and leave the site, keeping the browser running."""
+        self.driver.execute_script(CLEAR_STORAGE_JS)
+        self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+
+    def is_healthy(self):
+        """Return True if the browser still answers commands."""
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def memory_mb(self):
+        """Return the memory used by the browser process tree in MB, or None if it cannot be measured (requires psutil)."""
+        try:
+            import psutil
+        except ImportError:
+            if not self.psutil_warned:
+                self.logger.log("psutil is not installed, memory-based browser recycling is disabled "
+                                "(pip install psutil)", "warning")
+                self.psutil_warned = True
+            return None
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def needs_recycle(self):
+        """Return True if the browser has served too many jobs, uses too much memory or is dead."""
+        if self.jobs >= self.max_jobs:
+            self.logger.log(f"Recycling browser after {self.jobs} jobs")
+            return True
+        memory = self.memory_mb()
+        if memory is not None and memory > self.max_memory_mb:
+            self.logger.log(f"Recycling browser using {memory:.0f} MB")
+            return True
+        if not self.is_healthy():
+            self.logger.log("Recycling unresponsive browser", "warning")
+            return True
+        return False
+
+    def recycle(self):
+        """Quit the current browser and start a fresh one."""
+        self.close()
+        self.start()
+
+    def close(self):
+        """Quit the browser."""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self.logger.log(f"Error closing browser: {str(e)}", "error")
+            self.driver = None
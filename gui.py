@@ -5,6 +5,8 @@ import threading
 import os
 from scraper import RealEstateScraper
 from logger import Logger
+from sinks import create_sink
+from cache import ResultCache
 
 class RealEstateScraperGUI:
     """A GUI class for the Real Estate Data Scraper."""
@@ -21,6 +23,7 @@ class RealEstateScraperGUI:
         self.current_year = datetime.now().year
         self.scraping_thread = None
         self.is_scraping = False
+        self.scraper = None
         
         self.setup_gui()
         
@@ -44,6 +47,8 @@ class RealEstateScraperGUI:
         headless_frame.pack(fill=tk.X, pady=5)
         self.headless_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(headless_frame, text="Run in background", variable=self.headless_var).pack(side=tk.LEFT, padx=10)
+        self.lean_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(headless_frame, text="Lean profile (no images, fonts or trackers)", variable=self.lean_var).pack(side=tk.LEFT, padx=10)
         
         view_frame = ttk.LabelFrame(controls_frame, text="View Type", padding="10")
         view_frame.pack(fill=tk.X, pady=5)
@@ -77,6 +82,18 @@ class RealEstateScraperGUI:
         self.subregion_combo.set("Sve")
         self.subregion_combo.pack(side=tk.LEFT, padx=5)
         
+        output_frame = ttk.LabelFrame(controls_frame, text="Output", padding="10")
+        output_frame.pack(fill=tk.X, pady=5)
+        self.format_combo = ttk.Combobox(output_frame, values=["csv", "jsonl", "sqlite", "parquet"], state="readonly", width=30)
+        self.format_combo.set("csv")
+        self.format_combo.pack(side=tk.LEFT, padx=5)
+        self.excel_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(output_frame, text="Convert to Excel when done", variable=self.excel_var).pack(side=tk.LEFT, padx=10)
+        self.typed_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(output_frame, text="Typed columns", variable=self.typed_var).pack(side=tk.LEFT, padx=10)
+        self.force_refresh_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(output_frame, text="Force refresh (ignore cache)", variable=self.force_refresh_var).pack(side=tk.LEFT, padx=10)
+        
         button_frame = ttk.Frame(controls_frame)
         button_frame.pack(fill=tk.X, pady=10)
         self.start_button = ttk.Button(button_frame, text="Start Scraping", command=self.start_scraping)
@@ -92,6 +109,18 @@ class RealEstateScraperGUI:
         self.period_combo['values'] = periods
         self.period_combo.set(periods[0])
 
+    def get_scraper(self):
+        """Return the scraper, keeping its browser warm between runs with the same browser mode."""
+        browser_mode = (self.headless_var.get(), self.lean_var.get())
+        if self.scraper is not None and self.scraper_mode != browser_mode:
+            self.scraper.close()
+            self.scraper = None
+        if self.scraper is None:
+            headless, lean = browser_mode
+            self.scraper = RealEstateScraper(self.logger, headless=headless, lean=lean)
+            self.scraper_mode = browser_mode
+        return self.scraper
+
     def scraping_task(self):
         """Perform the scraping task in a separate thread."""
         scraper = None
@@ -99,7 +128,7 @@ class RealEstateScraperGUI:
             if not os.path.exists("output"):
                 os.makedirs("output")
             
-            scraper = RealEstateScraper(self.logger, headless=self.headless_var.get())
+            scraper = self.get_scraper()
             scraper.initialize_driver()
             
             view_type = self.view_type.get()
@@ -109,15 +138,21 @@ class RealEstateScraperGUI:
             sub_region = self.subregion_combo.get()
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"output/real_estate_data_{region}_{period}_{year}_{timestamp}.xlsx"
+            basename = f"output/real_estate_data_{region}_{period}_{year}_{timestamp}"
+            filename = f"{basename}.{self.format_combo.get()}"
             
-            scraper.set_filters(view_type, period, year, region, sub_region)
-            data = scraper.scrape_data()
+            filters = (view_type, period, year, region, sub_region)
+            with create_sink(filename) as sink:
+                scraper.scrape_job(filters, sink, cache=ResultCache(), force_refresh=self.force_refresh_var.get())
             
             if not self.is_scraping:
+                scraper.metrics.write_json(f"{basename}_metrics.json")
                 return
                 
-            scraper.save_to_excel(data, filename)
+            if self.excel_var.get() and sink.rows_written:
+                filename = f"{basename}.xlsx"
+                scraper.export_to_excel(sink.path, filename, typed=self.typed_var.get())
+            scraper.metrics.write_json(f"{basename}_metrics.json")
             self.logger.log(f"Data successfully saved to {filename}")
             messagebox.showinfo("Success", f"Data has been saved to {filename}")
             
@@ -126,7 +161,7 @@ class RealEstateScraperGUI:
             messagebox.showerror("Error", str(error))
         finally:
             if scraper:
-                scraper.close()
+                scraper.finish_job(keep_page=True)
             self.is_scraping = False
             self.root.after(0, self.update_buttons)
 
@@ -157,6 +192,7 @@ class RealEstateScraperGUI:
         self.year_combo.config(state=combo_state)
         self.region_combo.config(state=combo_state)
         self.subregion_combo.config(state=combo_state)
+        self.format_combo.config(state=combo_state)
 
     def on_closing(self):
         """Handle window closing."""
@@ -164,6 +200,9 @@ class RealEstateScraperGUI:
             self.stop_scraping()
             if self.scraping_thread:
                 self.scraping_thread.join(timeout=2)
+        if self.scraper:
+            self.scraper.close()
+        self.logger.close()
         self.root.destroy()
 
     def run(self):
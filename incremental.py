@@ -0,0 +1,82 @@
+"""Incremental updates of a job whose period is still open.
+
+The grid is sorted by Datum, newest first, and read page by page. Rows whose fingerprint is not
+among the rows already in the job's output are new; once the site's new total is accounted for,
+only those rows are appended to the output. If the stored rows no longer line up with the site,
+the whole period has to be scraped again.
+"""
+import os
+from collections import Counter
+
+from checkpoint import row_fingerprint
+from sinks import output_exists, read_frame
+
+
+def record_fingerprint(record, columns):
+    """Return the fingerprint of a record's columns, with every value compared as text."""
+    return row_fingerprint({column: "" if record.get(column) is None else str(record.get(column))
+                            for column in columns})
+
+
+def stored_fingerprints(path, columns):
+    """Return a Counter of the fingerprints of the rows in the output file at path.
+
+    The Counter is empty if the file does not exist or cannot be read.
+    """
+    if not output_exists(path) or (os.path.exists(path) and os.path.getsize(path) == 0):
+        return Counter()
+    try:
+        df = read_frame(path)
+    except Exception:
+        return Counter()
+    return Counter(record_fingerprint(record, columns) for record in df.to_dict("records"))
+
+
+class DeltaMerge:
+    """Collect the rows a period gained since the previous run from pages read newest first.
+
+    stored is a Counter of the fingerprints already in the output and reported_total the row count
+    the site reports now, so the period gained reported_total - len(stored) rows. Pages are added
+    until that many unknown rows have been found and a stored row has been reached.
+
+    resync_reason explains why the stored rows cannot be updated in place: the total dropped,
+    there are more unknown rows than the period gained, or the last page did not show them all.
+    """
+
+    def __init__(self, stored, reported_total, columns):
+        """Initialize the merge with the stored fingerprints, the reported total and the record columns."""
+        self.remaining = Counter(stored)
+        self.stored_rows = sum(stored.values())
+        self.expected = reported_total - self.stored_rows
+        self.columns = columns
+        self.new_rows = []
+        self.known_rows = 0
+        self.pages = 0
+        self.resync_reason = None
+        if self.expected < 0:
+            self.resync_reason = f"the site reports {reported_total} rows but {self.stored_rows} are stored"
+
+    @property
+    def done(self):
+        """Return True once every new row has been found."""
+        return self.resync_reason is None and self.known_rows > 0 and len(self.new_rows) == self.expected
+
+    def add_page(self, records):
+        """Sort one page of records into new and stored rows; return True when no further page is needed."""
+        self.pages += 1
+        for record in records:
+            fingerprint = record_fingerprint(record, self.columns)
+            if self.remaining[fingerprint] > 0:
+                self.remaining[fingerprint] -= 1
+                self.known_rows += 1
+            else:
+                self.new_rows.append(record)
+        if len(self.new_rows) > self.expected:
+            self.resync_reason = (f"{len(self.new_rows)} rows are not stored but the period only gained "
+                                  f"{self.expected}")
+        return self.resync_reason is not None or self.done
+
+    def finish(self):
+        """Mark the end of the pages; sets resync_reason if not every new row was found."""
+        if not self.done and self.resync_reason is None:
+            self.resync_reason = f"found {len(self.new_rows)} of {self.expected} new rows on all {self.pages} pages"
@@ -1,19 +1,107 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 import time
-import tkinter as tk
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+# Chatty per-element messages; runs of them are collapsed into one line in the GUI
+NOISY_PREFIXES = (
+    "Processed ",
+    "Waiting for element",
+    "Element found",
+    "Waited ",
+    "Attempting to click",
+    "Element clicked",
+)
+
+
+# One queue handler and listener per process, shared by every Logger in it
+_queue_handler = None
+_listener = None
+_log_file = None
+_owner_pid = None
+_users = 0
+
+
+def _install_handlers():
+    """Install the queue handler on the root logger and start its listener, once per process.
+
+    A worker process forked from a parent that already logs inherits the parent's queue
+    handler, whose queue nobody drains in the child; it is replaced by the child's own.
+    """
+    global _queue_handler, _listener, _log_file, _owner_pid
+    if _owner_pid == os.getpid():
+        return _log_file
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    Path("logs").mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    _log_file = f"logs/scraping_log_{timestamp}.txt"
+
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(_log_file, encoding="utf-8")
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Library records (e.g. webdriver-manager) go through the same queue at INFO and above
+    root.setLevel(logging.INFO)
+    root.addHandler(_queue_handler)
+    # Each Logger filters by its own level before handing records over
+    logging.getLogger("scraper").setLevel(logging.DEBUG)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    _listener.start()
+    _owner_pid = os.getpid()
+    atexit.register(_shutdown_handlers)
+    return _log_file
+
+
+def _shutdown_handlers():
+    """Flush pending records, stop the listener and remove the queue handler."""
+    global _listener, _owner_pid
+    if _listener is not None and _owner_pid == os.getpid():
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _owner_pid = None
+
 
 class Logger:
-    """A class to handle logging to both a file and a GUI widget."""
-    
-    def __init__(self, log_widget=None):
-        """Initialize the logger with an optional GUI log widget."""
+    """A class to handle logging to both a file and a GUI widget.
+
+    Callers only enqueue: a QueueListener thread writes the file and console output, and
+    the GUI drains its own queue in batches from the Tk event loop.
+    """
+
+    def __init__(self, log_widget=None, level="info", gui_level="info", max_lines=5000,
+                 batch_size=200, poll_ms=100):
+        """Initialize the logger with an optional GUI log widget and its display limits."""
         self.log_widget = log_widget
+        self.level = LEVELS[level]
+        self.gui_level = LEVELS[gui_level]
+        self.max_lines = max_lines
+        self.batch_size = batch_size
+        self.poll_ms = poll_ms
         self.start_time = None
         self.log_file = None
+        self.gui_queue = deque()
+        self.closed = False
         self.setup_logging()
-        
+
         # Messages that should appear in blue in the GUI
         self.blue_messages = [
             "Scraping completed. Total rows scraped:",
@@ -24,20 +112,17 @@ class Logger:
             "Browser closed successfully"
         ]
 
+        if self.log_widget:
+            self.log_widget.tag_config("blue", foreground="blue")
+            self.log_widget.tag_config("error", foreground="red")
+            self.log_widget.after(self.poll_ms, self.drain_gui_queue)
+
     def setup_logging(self):
-        """Configure logging to file and console."""
-        Path("logs").mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = f"logs/scraping_log_{timestamp}.txt"
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file),
-                logging.StreamHandler()
-            ]
-        )
+        """Route logging through the process's queue to a file and console handler on a listener thread."""
+        global _users
+        self.log_file = _install_handlers()
+        self.logger = logging.getLogger("scraper")
+        _users += 1
 
     def should_be_blue(self, message):
         """Check if the message should be displayed in blue."""
@@ -45,26 +130,86 @@ class Logger:
 
     def log(self, message, level="info"):
         """Log a message to file, console, and GUI if available."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        if level == "info":
-            logging.info(message)
-        elif level == "error":
-            logging.error(message)
-        elif level == "warning":
-            logging.warning(message)
-        
-        if self.log_widget:
-            log_entry = f"{timestamp} - {message}\n"
-            self.log_widget.insert(tk.END, log_entry)
-            
-            if self.should_be_blue(message):
-                end_pos = self.log_widget.index("end-1c")
-                start_pos = f"{float(end_pos) - 1:.1f}"
-                self.log_widget.tag_add("blue", start_pos, end_pos)
-                self.log_widget.tag_config("blue", foreground="blue")
-            
-            self.log_widget.see(tk.END)
+        levelno = LEVELS.get(level, logging.INFO)
+        if levelno < self.level:
+            return
+        self.logger.log(levelno, message)
+
+        if self.log_widget and levelno >= self.gui_level:
+            self.gui_queue.append((datetime.now().strftime("%Y-%m-%d %H:%M:%S"), message, levelno))
+
+    def drain_gui_queue(self):
+        """Insert queued messages into the GUI widget in one batch; runs on the Tk event loop."""
+        try:
+            entries = []
+            skipped = 0
+            # When the GUI falls far behind, noisy messages are dropped instead of queued
+            backlogged = len(self.gui_queue) > self.batch_size * 10
+            while self.gui_queue and len(entries) < self.batch_size:
+                entry = self.gui_queue.popleft()
+                if backlogged and self._is_noisy(entry):
+                    skipped += 1
+                    continue
+                entries.append(entry)
+            if skipped:
+                entries.append((datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                f"... {skipped} progress messages skipped", logging.INFO))
+            if entries:
+                self._insert_entries(self._coalesce(entries))
+        finally:
+            self.log_widget.after(self.poll_ms, self.drain_gui_queue)
+
+    def _is_noisy(self, entry):
+        """Return True for low-level progress messages that may be collapsed or dropped."""
+        return entry[2] < logging.WARNING and entry[1].startswith(NOISY_PREFIXES)
+
+    def _coalesce(self, entries):
+        """Collapse runs of noisy messages into their last message plus a count."""
+        coalesced = []
+        run = 0
+        for entry in entries:
+            noisy = self._is_noisy(entry)
+            if noisy and coalesced and coalesced[-1][3]:
+                run += 1
+                coalesced[-1] = entry + (True,)
+            else:
+                if run:
+                    timestamp, message, levelno, _ = coalesced[-1]
+                    coalesced[-1] = (timestamp, f"{message} (+{run} similar)", levelno, True)
+                run = 0
+                coalesced.append(entry + (noisy,))
+        if run:
+            timestamp, message, levelno, _ = coalesced[-1]
+            coalesced[-1] = (timestamp, f"{message} (+{run} similar)", levelno, True)
+        return coalesced
+
+    def _insert_entries(self, entries):
+        """Insert entries with a single widget call, trim old lines and scroll to the end."""
+        chunks = []
+        for timestamp, message, levelno, _ in entries:
+            tags = ()
+            if levelno >= logging.ERROR:
+                tags = ("error",)
+            elif self.should_be_blue(message):
+                tags = ("blue",)
+            chunks.extend((f"{timestamp} - {message}\n", tags))
+        self.log_widget.insert("end", *chunks)
+
+        line_count = int(self.log_widget.index("end-1c").split(".")[0])
+        if line_count > self.max_lines:
+            self.log_widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+        self.log_widget.see("end")
+
+    def close(self):
+        """Release the shared handlers; the last Logger to close flushes them and stops the listener."""
+        global _users
+        if self.closed:
+            return
+        self.closed = True
+        _users -= 1
+        if _users <= 0:
+            _users = 0
+            _shutdown_handlers()
 
     def start_timer(self):
         """Start the timer for scraping duration."""
@@ -1,11 +1,17 @@
 import logging
-from gui import RealEstateScraperGUI
-from tkinter import messagebox
+import sys
 
 if __name__ == "__main__":
+    # With arguments run headless from the command line, without loading tkinter
+    if len(sys.argv) > 1:
+        from cli import main
+        sys.exit(main())
+
     try:
+        from gui import RealEstateScraperGUI
         app = RealEstateScraperGUI()
         app.run()
     except Exception as e:
         logging.error(f"Application error: {str(e)}")
+        from tkinter import messagebox
         messagebox.showerror("Error", f"Application error: {str(e)}")
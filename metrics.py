@@ -0,0 +1,155 @@
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class RunMetrics:
+    """Durations and counts per scraping phase for one run.
+
+    Phases may overlap: "wait" includes the WebDriver polling done while waiting, and
+    "page_extraction" includes its own WebDriver commands.
+    """
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded values in place and restart the wall clock."""
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.phases = defaultdict(lambda: {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        self.counters = Counter()
+        self.values = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one occurrence of the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """Record one occurrence of a phase that took the given number of seconds."""
+        phase = self.phases[name]
+        phase["count"] += 1
+        phase["seconds"] += seconds
+        phase["max_seconds"] = max(phase["max_seconds"], seconds)
+
+    def count(self, name, n=1):
+        """Increase a counter."""
+        self.counters[name] += n
+
+    def set(self, name, value):
+        """Record a single value such as a latency or a byte count."""
+        self.values[name] = value
+
+    def seconds(self, prefix):
+        """Return the total seconds of all phases whose name starts with prefix."""
+        return sum(phase["seconds"] for name, phase in self.phases.items() if name.startswith(prefix))
+
+    def to_dict(self):
+        """Return a JSON-serialisable summary with derived rates."""
+        wall = time.perf_counter() - self._start
+        scrape_seconds = self.seconds("scrape")
+        wait_seconds = self.seconds("wait")
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": wall,
+            "phases": {name: dict(phase) for name, phase in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "values": dict(sorted(self.values.items())),
+            "derived": {
+                "rows_per_second": self.counters["rows"] / scrape_seconds if scrape_seconds else 0.0,
+                "wait_seconds": wait_seconds,
+                "active_seconds": max(wall - wait_seconds, 0.0),
+                "webdriver_seconds": self.seconds("webdriver"),
+            },
+        }
+
+    def write_json(self, path):
+        """Write the summary as JSON."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def write_prometheus(self, path, labels=None):
+        """Write the summary in the Prometheus textfile-collector format."""
+        write_prometheus(self.to_dict(), path, labels)
+
+
+def merge_metrics(summaries):
+    """Combine several to_dict() summaries into one, summing phases and counters."""
+    merged = RunMetrics()
+    wall = 0.0
+    for summary in summaries:
+        wall = max(wall, summary["wall_seconds"])
+        for name, phase in summary["phases"].items():
+            target = merged.phases[name]
+            target["count"] += phase["count"]
+            target["seconds"] += phase["seconds"]
+            target["max_seconds"] = max(target["max_seconds"], phase["max_seconds"])
+        merged.counters.update(summary["counters"])
+    result = merged.to_dict()
+    result["wall_seconds"] = wall
+    result["derived"]["active_seconds"] = max(wall - result["derived"]["wait_seconds"], 0.0)
+    return result
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).lower()
+
+
+def write_prometheus(summary, path, labels=None):
+    """Write a to_dict() summary in the Prometheus textfile-collector format."""
+    label_text = ",".join(f'{key}="{value}"' for key, value in sorted((labels or {}).items()))
+
+    def sample(name, value, extra=""):
+        parts = ",".join(part for part in (label_text, extra) if part)
+        return f"{name}{{{parts}}} {value}" if parts else f"{name} {value}"
+
+    lines = [
+        "# TYPE scraper_wall_seconds gauge",
+        sample("scraper_wall_seconds", summary["wall_seconds"]),
+        "# TYPE scraper_phase_seconds gauge",
+    ]
+    lines += [sample("scraper_phase_seconds", phase["seconds"], f'phase="{name}"')
+              for name, phase in summary["phases"].items()]
+    lines.append("# TYPE scraper_phase_count gauge")
+    lines += [sample("scraper_phase_count", phase["count"], f'phase="{name}"')
+              for name, phase in summary["phases"].items()]
+    for name, value in list(summary["counters"].items()) + list(summary.get("values", {}).items()) \
+            + list(summary["derived"].items()):
+        if isinstance(value, (int, float)):
+            metric = f"scraper_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} gauge", sample(metric, value)]
+
+    # Write then rename so the collector never reads a half-written file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def instrument_driver(driver, metrics):
+    """Count and time every WebDriver command sent by driver."""
+    if getattr(driver, "_metrics_instrumented", False):
+        return
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            metrics.add("webdriver", time.perf_counter() - start)
+            metrics.count("webdriver_commands")
+            metrics.count(f"webdriver_command:{driver_command}")
+
+    driver.execute = counted_execute
+    driver._metrics_instrumented = True
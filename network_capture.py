@@ -0,0 +1,130 @@
+import base64
+import json
+import re
+
+# Normalised JSON field names that map onto the DataGrid columns
+FIELD_ALIASES = {
+    'Tip': ('tip', 'type', 'vrsta', 'propertytype', 'tipnekretnine'),
+    'Datum': ('datum', 'date', 'datumprometa', 'transactiondate', 'contractdate'),
+    'Cena': ('cena', 'price', 'ukupnacena', 'totalprice', 'amount'),
+    'Površina': ('povrsina', 'površina', 'area', 'size', 'kvadratura', 'surface'),
+    'Cena/m²': ('cenam2', 'cenam²', 'cenapom2', 'cenapokvadratu', 'pricem2', 'pricepersqm',
+                'pricepersquaremeter', 'unitprice'),
+    'Predmet': ('predmet', 'predmeti', 'labels', 'tags', 'subject'),
+    'Lokacija': ('lokacija', 'location', 'opstina', 'opština', 'naselje', 'municipality'),
+}
+_ALIAS_TO_COLUMN = {alias: column for column, aliases in FIELD_ALIASES.items() for alias in aliases}
+TOTAL_KEYS = ('total', 'totalcount', 'rowcount', 'count', 'totalrows', 'totalitems')
+
+# A row must match at least this many columns to count as grid data
+MIN_MATCHED_COLUMNS = 4
+
+
+def enable_performance_logging(options):
+    """Turn on Chrome performance logging so network events can be read back."""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+
+def _normalise_key(key):
+    """Lower-case a JSON key and strip everything but letters and digits."""
+    return re.sub(r'[^0-9a-zšđčćž²]', '', str(key).lower())
+
+
+def _column_map(row):
+    """Return {json_key: column} for the keys of a row that match a grid column."""
+    mapping = {}
+    for key in row:
+        column = _ALIAS_TO_COLUMN.get(_normalise_key(key))
+        if column and column not in mapping.values():
+            mapping[key] = column
+    return mapping
+
+
+def _format_value(value):
+    """Turn a JSON value into the text the grid would show."""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ', '.join(_format_value(item) for item in value)
+    if isinstance(value, dict):
+        for key in ('label', 'name', 'naziv', 'value'):
+            if key in value:
+                return _format_value(value[key])
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def map_record(row, mapping=None):
+    """Map one JSON row to a record with the same columns as scrape_data."""
+    mapping = mapping or _column_map(row)
+    record = {column: '' for column in FIELD_ALIASES}
+    for key, column in mapping.items():
+        record[column] = _format_value(row[key])
+    return record
+
+
+def find_grid_rows(payload):
+    """Return the largest list of dicts in payload that looks like grid rows, or None."""
+    best = None
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            if node and all(isinstance(item, dict) for item in node):
+                if len(_column_map(node[0])) >= MIN_MATCHED_COLUMNS and (best is None or len(node) > len(best)):
+                    best = node
+            stack.extend(node)
+    return best
+
+
+def find_total(payload):
+    """Return the total row count announced in a payload, or None."""
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if _normalise_key(key) in TOTAL_KEYS and isinstance(value, int):
+                return value
+        for value in payload.values():
+            if isinstance(value, dict):
+                total = find_total(value)
+                if total is not None:
+                    return total
+    return None
+
+
+def drain_json_responses(driver):
+    """Read the performance log and return (url, payload) for every JSON response since the last call."""
+    responses = []
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message['params']
+        response = params.get('response', {})
+        if 'json' not in response.get('mimeType', ''):
+            continue
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+            text = body['body']
+            if body.get('base64Encoded'):
+                text = base64.b64decode(text).decode('utf-8')
+            responses.append((response.get('url'), json.loads(text)))
+        except Exception:
+            # The body may already be gone (redirects, preflights) or not be JSON at all
+            continue
+    return responses
+
+
+def extract_grid_records(responses):
+    """Return (records, total) from the most recent recognisable grid payload, or (None, None)."""
+    for _, payload in reversed(responses):
+        rows = find_grid_rows(payload)
+        if rows:
+            mapping = _column_map(rows[0])
+            return [map_record(row, mapping) for row in rows], find_total(payload)
+    return None, None
@@ -0,0 +1,107 @@
+"""Typed post-processing of scraped records.
+
+Scraped columns are text as the grid shows it ("50.000 €", "45,5 m²", "15.02.2019") or, from the
+network and HTTP backends, raw JSON numbers ("50000", "45.5"). normalize_frame parses them in bulk:
+
+- Cena becomes float64 and Površina and Cena/m² become float32, in euros and square metres
+- Datum becomes datetime64
+- Tip, Lokacija and Predmet become categoricals
+"""
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMN = "Cena"
+AREA_COLUMN = "Površina"
+UNIT_PRICE_COLUMN = "Cena/m²"
+DATE_COLUMN = "Datum"
+LOCATION_COLUMN = "Lokacija"
+CATEGORY_COLUMNS = ("Tip", "Lokacija", "Predmet")
+DATE_FORMAT = "%d.%m.%Y"
+# A unit or a decimal comma marks a number formatted for display rather than a raw JSON number
+SERBIAN_NUMBER_MARKERS = r"€|m²|m2|,"
+
+# The site rounds Cena/m² to whole euros, so allow a small relative and absolute difference
+UNIT_PRICE_TOLERANCE = 0.02
+UNIT_PRICE_ABSOLUTE_TOLERANCE = 1.0
+
+
+def parse_numbers(series, dtype="float64"):
+    """Parse a column of Serbian-formatted or plain numbers into floats; unparseable values become NaN.
+
+    Values as the grid shows them carry a unit or a decimal comma ("1.234.567 €", "45,5 m²") and
+    use "." for thousands and "," for decimals. Raw JSON numbers from the network and HTTP
+    backends ("523.125", "45.5") have neither and keep "." as the decimal point.
+    Each distinct text is parsed once.
+    """
+    codes, uniques = pd.factorize(series)
+    raw = pd.Series(uniques, dtype=object).astype(str)
+    serbian = raw.str.contains(SERBIAN_NUMBER_MARKERS, regex=True)
+    text = raw.str.replace(r"[^\d.,\-]", "", regex=True)
+    text = text.mask(serbian, text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    # Missing values have code -1, which picks the trailing NaN
+    values = np.append(pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64"), np.nan)
+    return pd.Series(values[codes], index=series.index, name=series.name).astype(dtype)
+
+
+def parse_dates(series):
+    """Parse a column of dd.mm.yyyy dates (with or without a trailing dot) into datetime64."""
+    text = series.astype("string").str.strip().str.rstrip(".")
+    return pd.to_datetime(text, format=DATE_FORMAT, errors="coerce")
+
+
+def normalize_frame(df):
+    """Return a copy of a scraped DataFrame with typed numeric, date and categorical columns.
+
+    Columns that are missing are left out; any other columns are kept unchanged.
+    """
+    df = df.copy()
+    if PRICE_COLUMN in df:
+        df[PRICE_COLUMN] = parse_numbers(df[PRICE_COLUMN], "float64")
+    for column in (AREA_COLUMN, UNIT_PRICE_COLUMN):
+        if column in df:
+            df[column] = parse_numbers(df[column], "float32")
+    if DATE_COLUMN in df:
+        df[DATE_COLUMN] = parse_dates(df[DATE_COLUMN])
+    for column in CATEGORY_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+    return df
+
+
+def unit_price_mismatches(df, tolerance=UNIT_PRICE_TOLERANCE, absolute_tolerance=UNIT_PRICE_ABSOLUTE_TOLERANCE):
+    """Return the rows of a normalized frame whose Cena/m² does not match Cena / Površina.
+
+    Rows missing any of the three values are not reported.
+    """
+    expected = df[PRICE_COLUMN] / df[AREA_COLUMN].astype("float64")
+    actual = df[UNIT_PRICE_COLUMN].astype("float64")
+    difference = (expected - actual).abs()
+    mismatched = (difference > absolute_tolerance) & (difference > tolerance * actual.abs())
+    return df[mismatched.fillna(False)]
+
+
+def log_unit_price_mismatches(df, logger):
+    """Log how many rows of a normalized frame have a Cena/m² that does not match Cena / Površina."""
+    count = len(unit_price_mismatches(df))
+    if count:
+        logger.log(f"{count} of {len(df)} rows have a Cena/m² that does not match Cena / Površina", "warning")
+    else:
+        logger.log("Cena/m² matches Cena / Površina in every row", "debug")
+    return count
+
+
+def aggregate_by_location(df, freq="M"):
+    """Return the median price per m², median price and transaction count per period and location.
+
+    freq is a pandas period frequency: "M" for months, "Q" for quarters, "Y" for years.
+    """
+    periods = df[DATE_COLUMN].dt.to_period(freq).rename("Period")
+    grouped = df.groupby([periods, df[LOCATION_COLUMN]], observed=True)
+    result = grouped.agg(**{
+        "Median Cena/m²": (UNIT_PRICE_COLUMN, "median"),
+        "Median Cena": (PRICE_COLUMN, "median"),
+        "Transactions": (PRICE_COLUMN, "size"),
+    }).reset_index()
+    # Periods as text, so the table can be written to Excel and CSV
+    result["Period"] = result["Period"].astype(str)
+    return result
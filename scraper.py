@@ -1,49 +1,260 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-import pandas as pd
+from selenium.common.exceptions import (TimeoutException, ElementClickInterceptedException,
+                                        StaleElementReferenceException)
 import time
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-import os
+import re
+from multiprocessing import util
+from selenium.webdriver.common.keys import Keys
+from waits import AdaptiveWaiter, AdaptivePacer, GridLoadError, MENU_SELECTOR
+from driver_manager import DriverSession
+import network_capture
+import browser_profile
+import sinks
+from checkpoint import row_fingerprint
+import incremental
+from metrics import RunMetrics, instrument_driver
+
+# Column order of the DataGrid on cenenekretnina.rs
+COLUMNS = ['Tip', 'Datum', 'Cena', 'Površina', 'Cena/m²', 'Predmet', 'Lokacija']
+DEFAULT_PAGE_SIZE = 25
+BASE_URL = "https://www.cenenekretnina.rs/"
+NEXT_BUTTON_XPATH = "//button[@aria-label='Sledeća strana']"
+DATE_HEADER_XPATH = ("//div[contains(@class, 'MuiDataGrid-columnHeader')]"
+                     "[.//div[contains(@class, 'MuiDataGrid-columnHeaderTitle') and normalize-space()='Datum']]")
+
+# Returns the aria-sort of the column header titled arguments[0] ("none" if it has none), or null
+COLUMN_SORT_JS = """
+const header = Array.from(document.querySelectorAll('.MuiDataGrid-columnHeader')).find(el => {
+    const title = el.querySelector('.MuiDataGrid-columnHeaderTitle');
+    return title && title.textContent.trim() === arguments[0];
+});
+return header ? header.getAttribute('aria-sort') || 'none' : null;
+"""
+
+# Reads every rendered MuiDataGrid-row. Each entry holds the seven cell texts
+# (the Predmet cell as its joined aria-labels) or an error.
+READ_ROWS_JS = """
+function readRows() {
+    const rows = document.getElementsByClassName('MuiDataGrid-row');
+    const result = [];
+    for (let i = 0; i < rows.length; i++) {
+        const row = rows[i];
+        const base = {index: i + 1, id: row.getAttribute('data-id'),
+                      rowIndex: parseInt(row.getAttribute('aria-rowindex') || '0', 10)};
+        try {
+            const cells = row.getElementsByClassName('MuiDataGrid-cell');
+            if (cells.length < 7) {
+                result.push(Object.assign(base, {skipped: true}));
+                continue;
+            }
+            const values = [];
+            for (let c = 0; c < 7; c++) {
+                if (c === 5) {
+                    const labels = Array.from(cells[c].querySelectorAll('[aria-label]'))
+                        .map(el => el.getAttribute('aria-label'));
+                    values.push(labels.join(', '));
+                } else {
+                    values.push((cells[c].innerText || '').trim());
+                }
+            }
+            result.push(Object.assign(base, {values: values}));
+        } catch (e) {
+            result.push(Object.assign(base, {error: String(e)}));
+        }
+    }
+    return result;
+}
+"""
+
+# Reads the rendered rows in a single round trip.
+EXTRACT_ROWS_JS = READ_ROWS_JS + "return readRows();"
+
+# The DataGrid only renders the rows inside its viewport. Steps the virtual
+# scroller from top to bottom, reading the rendered rows after each step and
+# deduplicating them by data-id, then resolves with all rows in grid order.
+HARVEST_ROWS_JS = READ_ROWS_JS + """
+const done = arguments[arguments.length - 1];
+const scroller = document.querySelector('.MuiDataGrid-virtualScroller');
+const seen = new Map();
+function collect() {
+    readRows().forEach(row => {
+        const key = row.id !== null ? row.id : (row.values || []).join('|') + '#' + row.rowIndex;
+        if (!seen.has(key)) { seen.set(key, row); }
+    });
+}
+function finish() {
+    const rows = Array.from(seen.values());
+    if (rows.every(row => row.rowIndex > 0)) { rows.sort((a, b) => a.rowIndex - b.rowIndex); }
+    if (scroller) { scroller.scrollTop = 0; }
+    done(rows);
+}
+if (!scroller || scroller.scrollHeight <= scroller.clientHeight) {
+    collect();
+    finish();
+} else {
+    scroller.scrollTop = 0;
+    const step = Math.max(1, Math.floor(scroller.clientHeight * 0.8));
+    (function next() {
+        requestAnimationFrame(() => requestAnimationFrame(() => {
+            collect();
+            if (scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 1) { finish(); return; }
+            scroller.scrollTop += step;
+            next();
+        }));
+    })();
+}
+"""
+
+# The filter selects in page order: period, year, region, sub-region
+FILTER_FIELDS = ("period", "year", "region", "sub_region")
+LANDING_BUTTON_XPATHS = ("/html/body/div[1]/div/div/div[2]/div[2]/div[1]/div/div/button[4]",
+                         "/html/body/div[1]/div/div/div[2]/div[1]/div/div[2]")
+
+# Returns the texts of the four filter selects if the filter panel of the site at
+# arguments[0] is open and visible, otherwise null.
+FILTER_STATE_JS = """
+if (location.origin !== new URL(arguments[0]).origin) { return null; }
+const selects = Array.from(document.querySelectorAll('div.MuiSelect-select'))
+    .filter(el => !el.classList.contains('MuiTablePagination-select'));
+if (selects.length < 4 || selects.slice(0, 4).some(el => el.offsetParent === null)) { return null; }
+return selects.slice(0, 4).map(el => (el.textContent || '').trim());
+"""
+
+# Clicks a pagination button `steps` times inside the browser, waiting for the
+# displayed-rows text to change after each click. Resolves to false if a step
+# times out or the button is disabled.
+SEEK_PAGES_JS = """
+const [steps, label, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const text = () => {
+    const el = document.querySelector('.MuiTablePagination-displayedRows');
+    return el ? el.textContent : '';
+};
+const loading = () => document.querySelector(
+    '.MuiDataGrid-overlay .MuiCircularProgress-root, .MuiDataGrid-overlay .MuiLinearProgress-root') !== null;
+let remaining = steps;
+function step() {
+    if (remaining === 0) { done(true); return; }
+    const button = document.querySelector(`button[aria-label="${label}"]`);
+    if (!button || button.disabled || button.classList.contains('Mui-disabled')) { done(false); return; }
+    const before = text();
+    const started = Date.now();
+    button.click();
+    (function poll() {
+        if (text() !== before && !loading()) { remaining--; step(); }
+        else if (Date.now() - started > timeoutMs) { done(false); }
+        else { setTimeout(poll, 20); }
+    })();
+}
+step();
+"""
+
+class PaginationError(Exception):
+    """Raised when the grid does not move to the page after the current one."""
+
+
+class ExtractionFallback(Exception):
+    """Raised when network capture stops recognising the grid data after pages were already read from it."""
+
+
+class IncompleteScrapeError(Exception):
+    """Raised when pages of a job still fail at its end; the job's checkpoint is kept so a rerun retries them."""
+
+
+# Errors from a slow, failing or re-rendering page that are worth another attempt
+TRANSIENT_ERRORS = (TimeoutException, StaleElementReferenceException, ElementClickInterceptedException,
+                    GridLoadError, PaginationError)
+
 
 class RealEstateScraper:
     """A class to scrape real estate data from cenenekretnina.rs."""
     
-    def __init__(self, logger, headless=False):
-        """Initialize the scraper with a logger and headless option."""
+    EXTRACTION_MODES = ("bulk", "element", "network")
+
+    def __init__(self, logger, headless=False, extraction_mode="bulk", max_wait=20,
+                 max_session_jobs=25, max_session_memory_mb=1024, page_retries=3, retry_backoff=1.0,
+                 metrics=None, base_url=BASE_URL, lean=False, blocked_urls=None, cache_dir=None,
+                 max_pacing_delay=5.0):
+        """Initialize the scraper with a logger, headless option, row extraction mode, wait upper bound,
+        browser recycling limits, per-page retry settings, an optional RunMetrics and the site URL.
+
+        Page changes are paced by an AdaptivePacer that pauses up to max_pacing_delay seconds
+        between them while the site is slow or failing.
+
+        lean=True selects the lean browser profile: requests matching blocked_urls (default
+        browser_profile.DEFAULT_BLOCKED_URLS) are refused and the disk cache lives in cache_dir,
+        by default a slot under ~/.cache/scrap/chrome-cache that is reused between runs.
+        """
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
         self.logger = logger
-        self.options = webdriver.ChromeOptions()
-        if headless:
-            self.options.add_argument('--headless=new')
-        self.options.add_argument('--start-maximized')
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('--disable-dev-shm-usage')
-        self.options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        self.extraction_mode = extraction_mode
+        self.base_url = base_url
+        self.max_wait = max_wait
+        self.page_retries = page_retries
+        self.retry_backoff = retry_backoff
+        # (view_type, period, year, region, sub_region) shown in the open filter panel, None if unknown
+        self.applied_filters = None
+        self.largest_page_size = None
+        self.driver = None
+        self.job_start_time = None
+        self.first_row_latency = None
+        self.dom_fallback = False
+        self.network_pages = 0
+        self.metrics = metrics or RunMetrics()
+        self.pacer = AdaptivePacer(max_delay=max_pacing_delay, metrics=self.metrics)
+        self.lean = lean
+        self.blocked_urls = browser_profile.DEFAULT_BLOCKED_URLS if blocked_urls is None else blocked_urls
+        if lean and cache_dir is None:
+            cache_dir, cache_lock = browser_profile.claim_cache_dir()
+            # close() may be followed by a restart, so the slot is held until the scraper is gone. Unlike
+            # weakref.finalize, this also runs in batch worker processes, which exit without atexit.
+            util.Finalize(self, browser_profile.release_cache_dir, args=(cache_lock,), exitpriority=0)
+        self.options = browser_profile.build_options(headless, lean, cache_dir)
+        if extraction_mode == "network":
+            network_capture.enable_performance_logging(self.options)
+        self.session = DriverSession(self.options, logger, max_jobs=max_session_jobs,
+                                     max_memory_mb=max_session_memory_mb, metrics=self.metrics)
 
     def initialize_driver(self):
-        """Set up the Chrome WebDriver."""
+        """Set up the Chrome WebDriver, reusing the warm browser session if there is one.
+
+        This starts a new job: the run metrics are reset here.
+        """
         try:
             self.logger.log("Initializing Chrome driver...")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=self.options)
-            self.driver.implicitly_wait(10)
+            self.metrics.reset()
+            self.job_start_time = time.time()
+            self.first_row_latency = None
+            # Network capture is used until a page is not recognised, then DOM scraping for the rest of the job
+            self.dom_fallback = False
+            self.network_pages = 0
+            with self.metrics.phase("driver_init"):
+                driver = self.session.acquire()
+            if driver is not self.driver:
+                # A new browser has none of the previous job's filters applied
+                self.applied_filters = None
+                self.largest_page_size = None
+            self.driver = driver
+            instrument_driver(self.driver, self.metrics)
+            if self.lean and self.blocked_urls:
+                browser_profile.apply_block_rules(self.driver, self.blocked_urls)
+            # Explicit waits only: an implicit wait stalls every "element is gone" check
+            self.driver.implicitly_wait(0)
+            self.waiter = AdaptiveWaiter(self.driver, self.logger, max_wait=self.max_wait, metrics=self.metrics)
             self.logger.log("Chrome driver initialized successfully")
         except Exception as e:
             self.logger.log(f"Failed to initialize Chrome driver: {str(e)}", "error")
             raise
 
-    def wait_for_element(self, by, value, timeout=20, clickable=False):
+    def wait_for_element(self, by, value, timeout=None, clickable=False):
         """Wait for an element to be present or clickable."""
         try:
-            self.logger.log(f"Waiting for element: {value}")
-            wait = WebDriverWait(self.driver, timeout)
+            self.logger.log(f"Waiting for element: {value}", "debug")
             condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
-            element = wait.until(condition((by, value)))
-            self.logger.log(f"Element found: {value}")
+            element = self.waiter.until(f"element {value}", condition((by, value)), timeout, "element")
+            self.logger.log(f"Element found: {value}", "debug")
             return element
         except TimeoutException:
             self.logger.log(f"Timeout waiting for element: {value}", "error")
@@ -52,147 +263,746 @@ class RealEstateScraper:
             self.logger.log(f"Error finding element {value}: {str(e)}", "error")
             raise
 
-    def safe_click(self, element, wait_time=1):
-        """Safely click an element with scrolling and delay."""
+    def safe_click(self, element):
+        """Safely click an element after scrolling it into view."""
         try:
-            self.logger.log("Attempting to click element")
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(wait_time)
-            element.click()
-            time.sleep(wait_time)
-            self.logger.log("Element clicked successfully")
+            self.logger.log("Attempting to click element", "debug")
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+            try:
+                element.click()
+            except ElementClickInterceptedException:
+                # A closing menu backdrop can still cover the element for a few frames
+                self.waiter.menu_closed()
+                element.click()
+            self.logger.log("Element clicked successfully", "debug")
         except Exception as e:
             self.logger.log(f"Failed to click element: {str(e)}", "error")
             raise
 
+    def select_option(self, dropdown_xpath, option_text, name="option"):
+        """Open a MUI Select dropdown and pick the option with the given text."""
+        with self.metrics.phase(f"filter:{name}"):
+            self._select_option(dropdown_xpath, option_text)
+
+    def _select_option(self, dropdown_xpath, option_text):
+        """Open the dropdown, pick the option and wait for the menu to close."""
+        dropdown = self.wait_for_element(By.XPATH, dropdown_xpath, clickable=True)
+        self.safe_click(dropdown)
+        self.waiter.menu_open()
+        option = self.wait_for_element(By.XPATH, f"//li[contains(@class, 'MuiMenuItem-root') and text()='{option_text}']", clickable=True)
+        self.safe_click(option)
+        self.waiter.menu_closed()
+
     def set_filters(self, view_type, period, year, region, sub_region=None):
-        """Apply filters on the website."""
+        """Apply filters on the website.
+
+        If the filter panel of the previous job is still open, only the filters that differ from
+        what the page shows are changed; when the page state cannot be verified, cookies and web
+        storage are cleared, the site is reloaded and every filter set.
+        """
         try:
             self.logger.log(f"Setting filters - View Type: {view_type}, Period: {period}, Year: {year}, Region: {region}")
-            self.driver.get("https://www.cenenekretnina.rs/")
-            time.sleep(5)
-            
-            first_button = self.wait_for_element(By.XPATH, "/html/body/div[1]/div/div/div[2]/div[2]/div[1]/div/div/button[4]", clickable=True)
-            self.safe_click(first_button)
-            second_button = self.wait_for_element(By.XPATH, "/html/body/div[1]/div/div/div[2]/div[1]/div/div[2]", clickable=True)
-            self.safe_click(second_button)
+            sub_region = sub_region or "Sve"
+            if self.applied_filters is not None:
+                if self.change_filters(view_type, period, year, region, sub_region):
+                    self.applied_filters = (view_type, period, str(year), region, sub_region)
+                    return
+                # The previous job's page cannot be reused, so the reload starts from a clean browser
+                self.session.reset()
+            self.applied_filters = None
+            with self.metrics.phase("navigation"):
+                self.driver.get(self.base_url)
+                if "first_navigation_at" not in self.metrics.values:
+                    self.metrics.set("first_navigation_at", time.time())
+                # Keep every request of the job in resource timing for record_resource_usage
+                self.driver.execute_script("performance.setResourceTimingBufferSize(100000);")
+
+                for xpath in LANDING_BUTTON_XPATHS:
+                    self.safe_click(self.wait_for_element(By.XPATH, xpath, clickable=True))
 
             # View type selection
             self.logger.log(f"Selecting view type: {view_type}")
-            view_xpath = "//button[contains(text(), 'Mesečno')]" if view_type == "monthly" else "//button[contains(text(), 'Kvartalno')]"
-            view_button = self.wait_for_element(By.XPATH, view_xpath, clickable=True)
-            self.safe_click(view_button)
+            with self.metrics.phase("filter:view_type"):
+                self.select_view_type(view_type)
 
             # Period selection
             self.logger.log(f"Selecting period: {period}")
-            period_dropdown = self.wait_for_element(By.XPATH, "//div[contains(@class, 'MuiSelect-select')]", clickable=True)
-            self.safe_click(period_dropdown)
-            period_option = self.wait_for_element(By.XPATH, f"//li[contains(@class, 'MuiMenuItem-root') and text()='{period}']", clickable=True)
-            self.safe_click(period_option)
+            self.select_option("(//div[contains(@class, 'MuiSelect-select')])[1]", period, "period")
 
             # Year selection
             self.logger.log(f"Selecting year: {year}")
-            year_dropdown = self.wait_for_element(By.XPATH, "(//div[contains(@class, 'MuiSelect-select')])[2]", clickable=True)
-            self.safe_click(year_dropdown)
-            year_option = self.wait_for_element(By.XPATH, f"//li[contains(@class, 'MuiMenuItem-root') and text()='{year}']", clickable=True)
-            self.safe_click(year_option)
+            self.select_option("(//div[contains(@class, 'MuiSelect-select')])[2]", year, "year")
 
             # Region selection
             if region:
                 self.logger.log(f"Selecting region: {region}")
-                region_dropdown = self.wait_for_element(By.XPATH, "(//div[contains(@class, 'MuiSelect-select')])[3]", clickable=True)
-                self.safe_click(region_dropdown)
-                region_option = self.wait_for_element(By.XPATH, f"//li[contains(@class, 'MuiMenuItem-root') and text()='{region}']", clickable=True)
-                self.safe_click(region_option)
+                self.select_option("(//div[contains(@class, 'MuiSelect-select')])[3]", region, "region")
 
             # Sub-region selection
-            if sub_region and sub_region != "Sve":
+            if sub_region != "Sve":
                 self.logger.log(f"Selecting sub-region: {sub_region}")
-                sub_region_dropdown = self.wait_for_element(By.XPATH, "(//div[contains(@class, 'MuiSelect-select')])[4]", clickable=True)
-                self.safe_click(sub_region_dropdown)
-                sub_region_option = self.wait_for_element(By.XPATH, f"//li[contains(@class, 'MuiMenuItem-root') and text()='{sub_region}']", clickable=True)
-                self.safe_click(sub_region_option)
+                self.select_option("(//div[contains(@class, 'MuiSelect-select')])[4]", sub_region, "sub_region")
 
             # Apply filters
-            search_button = self.wait_for_element(By.XPATH, "//button[contains(text(), 'Primeni')]", clickable=True)
-            self.safe_click(search_button, wait_time=2)
+            self.apply_filters()
+            self.applied_filters = (view_type, period, str(year), region, sub_region)
             self.logger.log("Filters applied successfully")
 
         except Exception as e:
             self.logger.log(f"Error in set_filters: {str(e)}", "error")
             raise
 
-    def scrape_data(self):
-        """Scrape data from the website."""
+    def select_view_type(self, view_type):
+        """Click the Mesečno or Kvartalno button."""
+        view_xpath = "//button[contains(text(), 'Mesečno')]" if view_type == "monthly" else "//button[contains(text(), 'Kvartalno')]"
+        self.safe_click(self.wait_for_element(By.XPATH, view_xpath, clickable=True))
+
+    def apply_filters(self):
+        """Press Primeni and wait for the grid to load, pressing it again if the grid reports an error."""
+        with self.metrics.phase("filter:apply"):
+            self.retry_transient(self._press_apply, "Applying filters")
+
+    def _press_apply(self):
+        """Press Primeni once and raise GridLoadError if the grid fails to load."""
+        search_button = self.wait_for_element(By.XPATH, "//button[contains(text(), 'Primeni')]", clickable=True)
+        self.safe_click(search_button)
+        self.waiter.grid_idle()
+        error = self.waiter.grid_error()
+        if error:
+            raise GridLoadError(error)
+
+    def retry_transient(self, action, description):
+        """Return action(), retrying it with exponential backoff after a transient page error.
+
+        Timeouts, stale elements, grid errors and pagination mismatches count as transient;
+        the last one is re-raised after page_retries retries.
+        """
+        for attempt in range(self.page_retries + 1):
+            try:
+                return action()
+            except TRANSIENT_ERRORS as e:
+                self.pacer.record_failure()
+                reason = str(e).strip() or type(e).__name__
+                if attempt == self.page_retries:
+                    self.logger.log(f"{description} failed after {attempt + 1} attempts: {reason}", "error")
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                self.metrics.count("retries")
+                self.logger.log(f"{description} failed ({reason}), retrying in {delay:.1f} seconds", "warning")
+                time.sleep(delay)
+
+    def read_filter_state(self):
+        """Return {field: text} of the filter selects, or None if the filter panel is not open."""
+        texts = self.driver.execute_script(FILTER_STATE_JS, self.base_url)
+        return dict(zip(FILTER_FIELDS, texts)) if texts else None
+
+    def change_filters(self, view_type, period, year, region, sub_region):
+        """Change only the filters that differ from the open filter panel and apply them.
+
+        Returns False, leaving the caller to reload the site, if the panel's state cannot be
+        verified before or after the changes or the grid does not restart on its first page.
+        """
+        try:
+            with self.metrics.phase("filter:diff"):
+                state = self.read_filter_state()
+                if state is None:
+                    self.logger.log("Filter panel is not open, reloading the site")
+                    return False
+                self.driver.execute_script("performance.clearResourceTimings();")
+                previous_sub_region = self.applied_filters[4]
+                changed = []
+                if view_type != self.applied_filters[0]:
+                    self.select_view_type(view_type)
+                    changed.append("view_type")
+                    state = self.read_filter_state()
+                wanted = {"period": period, "year": str(year), "region": region, "sub_region": sub_region}
+                for index, field in enumerate(FILTER_FIELDS):
+                    if state is None:
+                        break
+                    value = wanted[field]
+                    if not value or state[field] == value:
+                        continue
+                    # The site shows its own default text for "Sve"; only undo a sub-region we picked
+                    if field == "sub_region" and value == "Sve" and (
+                            previous_sub_region == "Sve" or state[field] != previous_sub_region):
+                        continue
+                    self.logger.log(f"Changing {field}: {state[field]} -> {value}")
+                    self.select_option(f"(//div[contains(@class, 'MuiSelect-select')])[{index + 1}]", value, field)
+                    changed.append(field)
+                    # A new region or view type can reset the selects after it
+                    state = self.read_filter_state()
+                if state is None or any(wanted[field] and field != "sub_region" and state[field] != wanted[field]
+                                        for field in FILTER_FIELDS) \
+                        or (sub_region != "Sve" and state["sub_region"] != sub_region):
+                    self.logger.log(f"Filter panel shows {state} after the changes, reloading the site", "warning")
+                    return False
+            self.apply_filters()
+            first, _, total = self.read_displayed_rows()
+            if total and first != 1:
+                self.logger.log(f"Grid starts at row {first} after applying filters, reloading the site", "warning")
+                return False
+        except Exception as e:
+            self.logger.log(f"Could not change filters in place ({str(e)}), reloading the site", "warning")
+            return False
+        self.metrics.count("filter_transitions")
+        self.metrics.count("filter_changes", len(changed))
+        self.logger.log(f"Changed {', '.join(changed) or 'no filters'} in place")
+        return True
+
+    def read_displayed_rows(self):
+        """Return (first, last, total) from the MuiTablePagination-displayedRows text, e.g. "1–25 od 123"."""
+        # The text is only final once the grid has finished loading
+        self.waiter.grid_idle()
+        for attempt in range(3):
+            try:
+                pagination_text = self.wait_for_element(By.CLASS_NAME, "MuiTablePagination-displayedRows").text
+                break
+            except StaleElementReferenceException:
+                # The pagination was re-rendered between finding it and reading it
+                if attempt == 2:
+                    raise
+        numbers = [int(re.sub(r'[.,]', '', number)) for number in re.findall(r'\d[\d.,]*', pagination_text)]
+        if len(numbers) < 3:
+            raise ValueError(f"Unexpected pagination text: {pagination_text}")
+        return numbers[0], numbers[1], numbers[-1]
+
+    def read_reported_total(self):
+        """Return the total row count shown in MuiTablePagination-displayedRows."""
+        return self.read_displayed_rows()[2]
+
+    def select_largest_page_size(self):
+        """Switch the grid to the largest rows-per-page option it offers and return that size."""
+        return self.retry_transient(self._select_largest_page_size, "Changing the page size")
+
+    def _select_largest_page_size(self):
+        """Pick the largest rows-per-page option once and wait for the grid to reload."""
+        try:
+            page_size_select = self.wait_for_element(By.CSS_SELECTOR, ".MuiTablePagination-select", timeout=5, clickable=True)
+        except TimeoutException:
+            self.logger.log("No rows-per-page selector found, keeping the current page size", "warning")
+            first, last, total = self.read_displayed_rows()
+            page_size = last - first + 1
+            # A single, partly filled page does not reveal the page size
+            return max(page_size, DEFAULT_PAGE_SIZE) if last == total else page_size
+        current = int(re.sub(r'\D', '', page_size_select.text) or DEFAULT_PAGE_SIZE)
+        total = self.read_reported_total()
+        if total <= current:
+            # The grid would not change when resized, so there would be no reload to wait for
+            self.logger.log(f"All {total} rows fit on one page of {current}, keeping the page size")
+            return current
+        if current == self.largest_page_size:
+            # The grid keeps its page size across filter changes
+            self.logger.log(f"Using page size {current}")
+            return current
+        self.safe_click(page_size_select)
+        self.waiter.menu_open()
+        options = {}
+        for option in self.driver.find_elements(By.CSS_SELECTOR, f"{MENU_SELECTOR} li"):
+            value = option.get_attribute('data-value') or option.text
+            if value and value.strip().isdigit():
+                options[int(value)] = option
+        if not options or max(options) <= current:
+            self.driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
+            self.waiter.menu_closed()
+            self.largest_page_size = current
+            self.logger.log(f"Using page size {current}")
+            return current
+        largest = max(options)
+        self.largest_page_size = largest
+        signature = self.waiter.grid_signature()
+        self.safe_click(options[largest])
+        self.waiter.menu_closed()
+        self.waiter.page_changed(signature)
+        self.logger.log(f"Page size set to {largest}")
+        return largest
+
+    def scrape_job(self, filters, sink, cache=None, force_refresh=False, checkpoints=None, incremental=False):
+        """Apply a (view_type, period, year, region, sub_region) tuple and scrape it into sink.
+
+        With a ResultCache, a cached result is served as long as the site still reports the
+        same total; otherwise the fresh rows are stored in the cache while they are scraped.
+        With incremental=True only the rows missing from sink's file are appended (see
+        scrape_incremental) and the cache and checkpoints are not used.
+        Returns the number of rows written.
+        """
+        self.set_filters(*filters)
+        try:
+            return self._scrape_job(filters, sink, cache, force_refresh, checkpoints, incremental)
+        except ExtractionFallback as e:
+            # Rows read from the network and from the DOM must not end up in the same output
+            self.logger.log(f"{str(e)}, scraping the job again with DOM scraping", "warning")
+            self.metrics.count("extraction_fallbacks")
+            # Every row is read again
+            self.metrics.counters.pop("rows", None)
+            if checkpoints is not None:
+                checkpoints.clear(filters)
+            if not incremental:
+                sink.reset()
+            self.applied_filters = None
+            self.set_filters(*filters)
+            return self._scrape_job(filters, sink, cache, force_refresh, checkpoints, incremental)
+        finally:
+            self.record_resource_usage()
+
+    def _scrape_job(self, filters, sink, cache, force_refresh, checkpoints, incremental):
+        """Scrape the job whose filters are applied into sink and return the number of rows written."""
+        if incremental:
+            return self.scrape_incremental(sink, filters)
+        if cache is None:
+            return self.scrape_data(sink, checkpoints, filters)
+        reported_total = self.read_reported_total()
+        if not force_refresh:
+            records = cache.get(filters, reported_total)
+            if records is not None:
+                self.logger.log(f"Serving {len(records)} cached rows, the site still reports {reported_total} items")
+                self.metrics.count("cache_hits")
+                self.metrics.count("rows", len(records))
+                sink.write_page(records)
+                return len(records)
+        else:
+            self.logger.log("Forced refresh, ignoring cached results")
+        with cache.writer(filters, reported_total) as cache_writer:
+            rows = self.scrape_data(sinks.TeeSink(sink, cache_writer), checkpoints, filters)
+            if cache_writer.commit():
+                self.logger.log(f"Cached {rows} rows for later runs")
+        return rows
+
+    def record_resource_usage(self):
+        """Record the bytes transferred by the job's page and the browser's memory in the metrics."""
+        try:
+            self.metrics.set("bytes_transferred", browser_profile.transferred_bytes(self.driver))
+            for name, value in browser_profile.renderer_memory(self.driver).items():
+                self.metrics.set(name, value)
+            browser_memory = self.session.memory_mb()
+            if browser_memory is not None:
+                self.metrics.set("browser_memory_mb", browser_memory)
+        except Exception as e:
+            self.logger.log(f"Could not measure resource usage: {str(e)}", "debug")
+
+    def scrape_data(self, sink=None, checkpoints=None, filters=None):
+        """Scrape data from the website.
+
+        Without a sink all rows are returned as a list. With an opened OutputSink each page
+        is written to it as soon as it is extracted and the number of rows is returned.
+        With a CheckpointStore and the job's (view_type, period, year, region, sub_region)
+        tuple as filters, progress is saved after every page
+        and a job that was interrupted resumes after its last completed page.
+        Pages that fail are visited again once the last page is done; if some still fail,
+        IncompleteScrapeError is raised and the checkpoint is kept for the next run.
+        """
         all_data = []
         page = 1
         total_rows = 0
+        failed_pages = []
+        checkpoint_page = None
+        last_row_hash = None
+        scrape_start = time.perf_counter()
         
         try:
             self.logger.log("Starting data scraping...")
-            time.sleep(2)
-            pagination_text = self.driver.find_element(By.CLASS_NAME, "MuiTablePagination-displayedRows").text
-            total_items = int(pagination_text.split(" ")[-1])
-            items_per_page = 25
+            total_items = self.read_reported_total()
+            if total_items == 0:
+                self.logger.log("No items found for these filters")
+                if checkpoints is not None and filters is not None and checkpoints.load(filters):
+                    # Rows written before the interruption are gone from the site too
+                    checkpoints.clear(filters)
+                    if sink is not None:
+                        sink.reset()
+                return 0 if sink is not None else all_data
+            items_per_page = self.select_largest_page_size()
             total_pages = (total_items + items_per_page - 1) // items_per_page
             
             self.logger.log(f"Found {total_items} items across {total_pages} pages")
             
-            while True:
+            use_checkpoints = checkpoints is not None and filters is not None
+            checkpoint = checkpoints.load(filters) if use_checkpoints else None
+            has_more_pages = True
+            if checkpoint:
+                if self.resume_from_checkpoint(checkpoint):
+                    total_rows = checkpoint.row_count
+                    if sink is not None:
+                        # Drop a page that was written after the checkpoint was saved
+                        sink.truncate(total_rows)
+                    # Failed pages after the checkpointed one are read again below anyway
+                    failed_pages = [failed for failed in checkpoint.failed_pages if failed <= checkpoint.page]
+                    page = checkpoint_page = checkpoint.page
+                    last_row_hash = checkpoint.last_row_hash
+                    has_more_pages = self.go_to_next_page()
+                    if has_more_pages:
+                        page += 1
+                        self.logger.log(f"Moving to page {page}")
+                else:
+                    checkpoints.clear(filters)
+                    if sink is not None:
+                        sink.reset()
+                    # A reload shows page 1 again, possibly with the site's default page size
+                    items_per_page = self.select_largest_page_size()
+                    first, _, _ = self.read_displayed_rows()
+                    if first > 1:
+                        raise PaginationError(f"Grid starts at row {first} instead of 1 after abandoning the checkpoint")
+            
+            while has_more_pages:
                 start_time = time.time()
-                self.wait_for_element(By.CLASS_NAME, "MuiDataGrid-row")
-                rows = self.driver.find_elements(By.CLASS_NAME, "MuiDataGrid-row")
-                self.logger.log(f"Processing page {page}/{total_pages} with {len(rows)} rows")
+                self.logger.log(f"Processing page {page}/{total_pages}")
                 
-                for row_index, row in enumerate(rows, 1):
-                    try:
-                        cells = row.find_elements(By.CLASS_NAME, "MuiDataGrid-cell")
-                        if len(cells) >= 7:
-                            predmet_cell = cells[5]
-                            predmet_labels = [label.get_attribute('aria-label') 
-                                            for label in predmet_cell.find_elements(By.CSS_SELECTOR, '[aria-label]')]
-                            predmet_text = ', '.join(predmet_labels)
-                            
-                            data = {
-                                'Tip': cells[0].text,
-                                'Datum': cells[1].text,
-                                'Cena': cells[2].text,
-                                'Površina': cells[3].text,
-                                'Cena/m²': cells[4].text,
-                                'Predmet': predmet_text,
-                                'Lokacija': cells[6].text
-                            }
-                            all_data.append(data)
-                            total_rows += 1
-                            
-                            if row_index % 5 == 0:
-                                self.logger.log(f"Processed {row_index}/{len(rows)} rows on page {page}")
-                                
-                    except Exception as e:
-                        self.logger.log(f"Error processing row {row_index} on page {page}: {str(e)}", "error")
-                        continue
+                with self.metrics.phase("page_extraction"):
+                    page_data = self.extract_page_with_retry(page)
+                if page_data is None:
+                    failed_pages.append(page)
+                    self.metrics.count("failed_pages")
+                    page_data = []
+                if page_data and self.first_row_latency is None and self.job_start_time:
+                    self.first_row_latency = time.time() - self.job_start_time
+                    self.metrics.set("startup_to_first_row_seconds", self.first_row_latency)
+                    self.logger.log(f"Startup to first row: {self.first_row_latency:.2f} seconds")
+                if sink is not None:
+                    with self.metrics.phase("sink_write"):
+                        sink.write_page(page_data)
+                else:
+                    all_data.extend(page_data)
+                total_rows += len(page_data)
+                self.metrics.count("rows", len(page_data))
+                self.metrics.count("pages")
+                
+                if use_checkpoints and page_data:
+                    checkpoint_page, last_row_hash = page, row_fingerprint(page_data[-1])
+                    checkpoints.save(filters, checkpoint_page, total_rows, last_row_hash, failed_pages)
                 
                 page_time = time.time() - start_time
                 self.logger.log(f"Page {page} completed in {page_time:.2f} seconds")
                 
-                try:
-                    next_button = self.wait_for_element(By.XPATH, "//button[@aria-label='Sledeća strana']", timeout=5)
-                    if 'Mui-disabled' in next_button.get_attribute('class'):
-                        self.logger.log("Reached last page")
-                        break
-                    self.safe_click(next_button)
+                with self.metrics.phase("pagination"):
+                    has_more_pages = self.go_to_next_page()
+                if has_more_pages:
                     page += 1
                     self.logger.log(f"Moving to page {page}")
-                except Exception:
-                    self.logger.log("No more pages to scrape")
-                    break
                     
+            for failed_page in sorted(failed_pages, reverse=True):
+                self.logger.log(f"Retrying page {failed_page}, which failed earlier")
+                try:
+                    with self.metrics.phase("page_extraction"):
+                        page_data = self.revisit_page(failed_page, page)
+                except ExtractionFallback:
+                    raise
+                except Exception as e:
+                    self.logger.log(f"Could not go back to page {failed_page}: {str(e)}", "error")
+                    break
+                page = failed_page
+                if page_data is None:
+                    continue
+                if sink is not None:
+                    with self.metrics.phase("sink_write"):
+                        sink.write_page(page_data)
+                else:
+                    all_data.extend(page_data)
+                total_rows += len(page_data)
+                self.metrics.count("rows", len(page_data))
+                self.metrics.count("recovered_pages")
+                failed_pages.remove(failed_page)
+                if use_checkpoints and checkpoint_page is not None:
+                    checkpoints.save(filters, checkpoint_page, total_rows, last_row_hash, failed_pages)
+
+            if failed_pages:
+                pages = ', '.join(map(str, sorted(failed_pages)))
+                self.logger.log(f"Pages that could not be scraped: {pages}", "warning")
+                raise IncompleteScrapeError(f"{len(failed_pages)} pages could not be scraped ({pages}), "
+                                            f"{total_rows} rows were written")
+            if use_checkpoints:
+                checkpoints.clear(filters)
             self.logger.log(f"Scraping completed. Total rows scraped: {total_rows}")
-            return all_data
+            self.logger.log(f"Total time spent waiting on the page: {self.waiter.total_wait():.2f} seconds")
+            return total_rows if sink is not None else all_data
             
+        except ExtractionFallback:
+            raise
         except Exception as e:
             self.logger.log(f"Error during scraping: {str(e)}", "error")
             raise
+        finally:
+            self.metrics.add("scrape", time.perf_counter() - scrape_start)
+
+    def scrape_incremental(self, sink, filters):
+        """Append to sink only the rows the period gained since its file was last written.
+
+        sink must be opened with append=True. The grid is read newest first until every new row
+        has been found, usually on the first page or two. Without earlier rows, or when they no
+        longer line up with the site, sink is reset and the whole period is scraped again.
+        Returns the number of rows written.
+        """
+        try:
+            self.logger.log("Starting incremental update...")
+            stored = incremental.stored_fingerprints(sink.path, COLUMNS)
+            if not stored:
+                self.logger.log("No earlier rows to update, scraping the whole period")
+                sink.reset()
+                return self.scrape_data(sink)
+            with self.metrics.phase("scrape:incremental"):
+                delta = self.find_new_rows(stored)
+            if delta.resync_reason:
+                self.logger.log(f"Cannot update incrementally ({delta.resync_reason}), "
+                                f"scraping the whole period again", "warning")
+                self.metrics.count("full_resyncs")
+                sink.reset()
+                # Back to the first page of the job
+                self.set_filters(*filters)
+                return self.scrape_data(sink)
+            with self.metrics.phase("sink_write"):
+                sink.write_page(delta.new_rows)
+            self.metrics.count("rows", len(delta.new_rows))
+            self.metrics.count("pages", delta.pages)
+            self.logger.log(f"Added {len(delta.new_rows)} new rows from {delta.pages} pages "
+                            f"({delta.stored_rows} rows were already stored)")
+            return len(delta.new_rows)
+        except ExtractionFallback:
+            raise
+        except Exception as e:
+            self.logger.log(f"Error during incremental update: {str(e)}", "error")
+            raise
+
+    def find_new_rows(self, stored):
+        """Read the grid newest first into an incremental.DeltaMerge of the stored fingerprints and return it."""
+        delta = incremental.DeltaMerge(stored, self.read_reported_total(), COLUMNS)
+        # A period that is now empty already needs a resync here, as rows are stored
+        if delta.resync_reason:
+            return delta
+        self.select_largest_page_size()
+        try:
+            self.sort_by_date_descending()
+        except Exception as e:
+            delta.resync_reason = f"could not sort by Datum: {str(e).strip() or type(e).__name__}"
+            return delta
+        page = 1
+        while True:
+            with self.metrics.phase("page_extraction"):
+                page_data = self.extract_page_with_retry(page)
+            if page_data is None:
+                delta.resync_reason = f"page {page} could not be read"
+                return delta
+            if delta.add_page(page_data):
+                return delta
+            with self.metrics.phase("pagination"):
+                has_more_pages = self.go_to_next_page()
+            if not has_more_pages:
+                delta.finish()
+                return delta
+            page += 1
+
+    def sort_by_date_descending(self):
+        """Sort the grid by Datum, newest first, by clicking its column header."""
+        with self.metrics.phase("sort"):
+            self.retry_transient(self._sort_by_date_descending, "Sorting by Datum")
+
+    def _sort_by_date_descending(self):
+        """Click the Datum header until it reports a descending sort and the grid shows its first page."""
+        # The header cycles through ascending, descending and unsorted
+        for clicks in range(4):
+            current = self.driver.execute_script(COLUMN_SORT_JS, "Datum")
+            if current is None:
+                raise ValueError("The grid has no Datum column header")
+            if current == "descending":
+                break
+            if clicks == 3:
+                raise ValueError(f"The Datum column sorts {current} after {clicks} clicks")
+            self.safe_click(self.wait_for_element(By.XPATH, DATE_HEADER_XPATH, clickable=True))
+            self.waiter.until("grid to change its sort",
+                              lambda driver: driver.execute_script(COLUMN_SORT_JS, "Datum") != current, kind="sort")
+            self.waiter.grid_idle()
+            error = self.waiter.grid_error()
+            if error:
+                raise GridLoadError(error)
+        first, _, total = self.read_displayed_rows()
+        if total and first != 1:
+            raise PaginationError(f"Grid starts at row {first} after sorting")
+
+    def extract_page_with_retry(self, page):
+        """Extract the current page, retrying with exponential backoff; return None if it keeps failing.
+
+        The number of rows is checked against the pagination text; a short page is retried and
+        only accepted as it is on the last attempt.
+        """
+        for attempt in range(self.page_retries + 1):
+            try:
+                self.wait_for_element(By.CLASS_NAME, "MuiDataGrid-row")
+                page_data = self.extract_rows(page)
+                first, last, _ = self.read_displayed_rows()
+                expected = last - first + 1
+                if len(page_data) != expected:
+                    message = f"Page {page} has {len(page_data)} rows, pagination shows {expected}"
+                    if attempt == self.page_retries:
+                        self.logger.log(message, "warning")
+                        return page_data
+                    raise ValueError(message)
+                return page_data
+            except ExtractionFallback:
+                raise
+            except Exception as e:
+                if attempt == self.page_retries:
+                    self.logger.log(f"Giving up on page {page} after {attempt + 1} attempts: {str(e)}", "error")
+                    return None
+                delay = self.retry_backoff * 2 ** attempt
+                self.metrics.count("retries")
+                self.logger.log(f"Error on page {page} ({str(e)}), retrying in {delay:.1f} seconds", "warning")
+                time.sleep(delay)
+
+    def go_to_next_page(self):
+        """Click "Sledeća strana" and wait for the next page; return False on the last page.
+
+        The last page is told from the pagination text rather than from the button. A stale or
+        missing button, a timeout, a grid error or a grid that does not continue right after the
+        current page is retried with exponential backoff; PaginationError is raised if it keeps failing.
+        """
+        first, last, total = self.read_displayed_rows()
+        if last >= total:
+            self.logger.log("Reached last page")
+            return False
+        try:
+            self.retry_transient(lambda: self._advance_page(first, last), f"Moving past rows {first}–{last}")
+        except TRANSIENT_ERRORS as e:
+            raise PaginationError(f"Could not move past rows {first}–{last} of {total}: "
+                                  f"{str(e).strip() or type(e).__name__}") from e
+        return True
+
+    def _advance_page(self, first, last):
+        """Click "Sledeća strana" unless an earlier attempt already moved the grid, then check that
+        the grid continues at row last + 1."""
+        current = self.read_displayed_rows()[0]
+        if current == first:
+            self.pacer.wait()
+            next_button = self.wait_for_element(By.XPATH, NEXT_BUTTON_XPATH, timeout=5, clickable=True)
+            signature = self.waiter.grid_signature()
+            clicked = time.perf_counter()
+            self.safe_click(next_button)
+            self.waiter.page_changed(signature)
+            self.pacer.record(time.perf_counter() - clicked)
+            current = self.read_displayed_rows()[0]
+        if current != last + 1:
+            raise PaginationError(f"Grid continues at row {current} instead of {last + 1}")
+
+    def seek_to_page(self, page, current_page=1):
+        """Move the pagination from current_page to the given page, either way, without extracting anything."""
+        steps = page - current_page
+        if steps == 0:
+            return True
+        self.logger.log(f"Jumping to page {page}")
+        self.driver.set_script_timeout(self.max_wait * abs(steps))
+        label = 'Sledeća strana' if steps > 0 else 'Prethodna strana'
+        return self.driver.execute_async_script(SEEK_PAGES_JS, abs(steps), label, self.max_wait * 1000)
+
+    def revisit_page(self, page, current_page):
+        """Go back from current_page to a page that failed and extract it again; return None if it fails again."""
+        if not self.seek_to_page(page, current_page):
+            raise PaginationError(f"The grid did not reach page {page}")
+        return self.extract_page_with_retry(page)
+
+    def resume_from_checkpoint(self, checkpoint):
+        """Jump to the checkpointed page and check that its last row is unchanged."""
+        self.logger.log(f"Resuming after page {checkpoint.page} ({checkpoint.row_count} rows already scraped)")
+        if not self.seek_to_page(checkpoint.page):
+            self.logger.log("Could not reach the checkpointed page, starting over from page 1", "warning")
+            # The seek may have moved some pages forward before it gave up
+            self.set_filters(*checkpoint.filters)
+            return False
+        page_data = self.extract_page_with_retry(checkpoint.page)
+        if not page_data or row_fingerprint(page_data[-1]) != checkpoint.last_row_hash:
+            self.logger.log("Checkpointed rows do not match the grid, starting over from page 1", "warning")
+            # The grid is no longer on page 1, so start from a fresh page load of the same filters
+            self.set_filters(*checkpoint.filters)
+            return False
+        self.logger.log(f"Checkpoint verified on page {checkpoint.page}")
+        return True
+
+    def extract_rows(self, page):
+        """Extract the rows of the current page using the configured extraction mode.
+
+        In network mode the first page whose data is not recognised switches the rest of the job
+        to DOM scraping, as the two give differently formatted values. If earlier pages were
+        already read from the network, ExtractionFallback is raised so the job starts over.
+        """
+        if self.extraction_mode == "network" and not self.dom_fallback:
+            page_data = self.extract_rows_network(page)
+            if page_data is not None:
+                self.network_pages += 1
+                return page_data
+            self.dom_fallback = True
+            if self.network_pages:
+                raise ExtractionFallback(f"Grid data not recognised in network responses on page {page}")
+            self.logger.log(f"Grid data not recognised in network responses on page {page}, "
+                            f"using DOM scraping for this job", "warning")
+        if self.extraction_mode in ("bulk", "network"):
+            return self.extract_rows_bulk(page)
+        return self.extract_rows_elementwise(page)
+
+    def extract_rows_bulk(self, page):
+        """Extract all rows of the current page in one script call, scrolling the virtualized grid."""
+        page_data = []
+        self.driver.set_script_timeout(self.max_wait)
+        for row in self.driver.execute_async_script(HARVEST_ROWS_JS):
+            if row.get('error'):
+                self.logger.log(f"Error processing row {row['index']} on page {page}: {row['error']}", "error")
+            elif not row.get('skipped'):
+                page_data.append(dict(zip(COLUMNS, row['values'])))
+        self.logger.log(f"Processed {len(page_data)} rows on page {page}")
+        return page_data
+
+    def extract_rows_network(self, page):
+        """Build the rows of the current page from the JSON responses behind the grid.
+
+        Returns None if no captured response looks like grid data.
+        """
+        responses = network_capture.drain_json_responses(self.driver)
+        page_data, total = network_capture.extract_grid_records(responses)
+        if page_data is None:
+            return None
+        self.logger.log(f"Captured {len(page_data)} rows on page {page} from {len(responses)} JSON responses"
+                        + (f" (total {total})" if total is not None else ""))
+        return page_data
+
+    def extract_rows_elementwise(self, page):
+        """Extract rows with one WebDriver call per cell (slow, kept as a fallback).
+
+        If the grid re-renders while it is being read, the rows are found again and read from the start.
+        """
+        for attempt in range(3):
+            try:
+                return self._read_rows_elementwise(page)
+            except StaleElementReferenceException:
+                self.metrics.count("stale_rows")
+                self.logger.log(f"Rows on page {page} were re-rendered while being read, reading them again", "warning")
+        return self._read_rows_elementwise(page)
+
+    def _read_rows_elementwise(self, page):
+        """Read the rendered rows once; raises StaleElementReferenceException if they are replaced meanwhile."""
+        page_data = []
+        rows = self.driver.find_elements(By.CLASS_NAME, "MuiDataGrid-row")
+        for row_index, row in enumerate(rows, 1):
+            try:
+                cells = row.find_elements(By.CLASS_NAME, "MuiDataGrid-cell")
+                if len(cells) >= 7:
+                    predmet_cell = cells[5]
+                    predmet_labels = [label.get_attribute('aria-label') 
+                                    for label in predmet_cell.find_elements(By.CSS_SELECTOR, '[aria-label]')]
+                    predmet_text = ', '.join(predmet_labels)
+                    
+                    data = {
+                        'Tip': cells[0].text,
+                        'Datum': cells[1].text,
+                        'Cena': cells[2].text,
+                        'Površina': cells[3].text,
+                        'Cena/m²': cells[4].text,
+                        'Predmet': predmet_text,
+                        'Lokacija': cells[6].text
+                    }
+                    page_data.append(data)
+                    
+                    if row_index % 5 == 0:
+                        self.logger.log(f"Processed {row_index}/{len(rows)} rows on page {page}", "debug")
+                        
+            except StaleElementReferenceException:
+                raise
+            except Exception as e:
+                self.logger.log(f"Error processing row {row_index} on page {page}: {str(e)}", "error")
+                continue
+        return page_data
 
     def save_to_excel(self, data, filename='real_estate_data.xlsx'):
         """Save scraped data to an Excel file."""
@@ -201,19 +1011,42 @@ class RealEstateScraper:
                 self.logger.log("No data to save", "warning")
                 return
             self.logger.log(f"Saving {len(data)} records to Excel file: {filename}")
-            df = pd.DataFrame(data)
-            df.to_excel(filename, index=False)
+            with self.metrics.phase("export"):
+                import pandas as pd
+                df = pd.DataFrame(data)
+                df.to_excel(filename, index=False)
             self.logger.log("Data saved successfully")
         except Exception as e:
             self.logger.log(f"Error saving to Excel: {str(e)}", "error")
             raise
 
+    def export_to_excel(self, source, filename, typed=False):
+        """Convert a streamed output file to an Excel file, with typed columns if typed is True."""
+        try:
+            self.logger.log(f"Saving {source} to Excel file: {filename}")
+            with self.metrics.phase("export"):
+                rows = sinks.convert_to_excel(source, filename, typed=typed, logger=self.logger)
+            self.logger.log(f"Data saved successfully ({rows} records)")
+        except Exception as e:
+            self.logger.log(f"Error saving to Excel: {str(e)}", "error")
+            raise
+
+    def finish_job(self, keep_page=False):
+        """Reset the browser for the next job while keeping it running.
+
+        With keep_page=True the site stays open, so the next job only changes the filters that differ.
+        """
+        if self.session.driver is not None:
+            if keep_page:
+                self.session.release(reset=False)
+                return
+            self.logger.log("Resetting browser for the next job")
+            self.applied_filters = None
+            self.session.release()
+
     def close(self):
         """Close the WebDriver."""
-        if hasattr(self, 'driver'):
-            try:
-                self.logger.log("Closing browser")
-                self.driver.quit()
-                self.logger.log("Browser closed successfully")
-            except Exception as e:
-                self.logger.log(f"Error closing browser: {str(e)}", "error")
+        if self.session.driver is not None:
+            self.logger.log("Closing browser")
+            self.session.close()
+            self.logger.log("Browser closed successfully")
@@ -0,0 +1,356 @@
+import csv
+import itertools
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+
+class OutputSink:
+    """Base class for writers that receive scraped records one page at a time."""
+
+    def __init__(self, path, append=False):
+        """Initialize the sink with an output path; append keeps rows already in the file."""
+        self.path = str(path)
+        self.append = append
+        self.rows_written = 0
+        self.columns = None
+
+    def open(self):
+        """Open the underlying file."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+    def write_page(self, records):
+        """Append one page of records and flush them to disk."""
+        if not records:
+            return
+        if self.columns is None:
+            self.columns = list(records[0].keys())
+        self._write(records)
+        self.rows_written += len(records)
+
+    def _write(self, records):
+        raise NotImplementedError
+
+    def reset(self):
+        """Discard everything written to the file so far."""
+        self.rows_written = 0
+
+    def truncate(self, rows):
+        """Keep only the first rows records of the file, e.g. to drop a page written after the last checkpoint."""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and close the underlying file."""
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(OutputSink):
+    """Stream records to a UTF-8 CSV file."""
+
+    def open(self):
+        super().open()
+        write_header = not (self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0)
+        self.file = open(self.path, "a" if self.append else "w", newline="", encoding="utf-8")
+        self.writer = None
+        self.write_header = write_header
+
+    def _write(self, records):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=self.columns)
+            if self.write_header:
+                self.writer.writeheader()
+        self.writer.writerows(records)
+        self.file.flush()
+
+    def reset(self):
+        super().reset()
+        self.file.seek(0)
+        self.file.truncate()
+        self.writer = None
+        self.write_header = True
+
+    def truncate(self, rows):
+        self.file.close()
+        with open(self.path, newline="", encoding="utf-8") as f:
+            lines = list(itertools.islice(csv.reader(f), rows + 1))
+        _replace_file(self.path, lambda f: csv.writer(f).writerows(lines), newline="")
+        self.file = open(self.path, "a", newline="", encoding="utf-8")
+        self.writer = None
+        self.write_header = not lines
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesSink(OutputSink):
+    """Stream records to a JSON Lines file, one object per line."""
+
+    def open(self):
+        super().open()
+        self.file = open(self.path, "a" if self.append else "w", encoding="utf-8")
+
+    def _write(self, records):
+        self.file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        self.file.flush()
+
+    def reset(self):
+        super().reset()
+        self.file.seek(0)
+        self.file.truncate()
+
+    def truncate(self, rows):
+        self.file.close()
+        with open(self.path, encoding="utf-8") as f:
+            lines = list(itertools.islice(f, rows))
+        _replace_file(self.path, lambda f: f.writelines(lines))
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteSink(OutputSink):
+    """Stream records into a SQLite table, committing after every page."""
+
+    def __init__(self, path, append=False, table="records"):
+        """Initialize the sink with an output path and table name."""
+        super().__init__(path, append)
+        self.table = table
+
+    def open(self):
+        super().open()
+        self.connection = sqlite3.connect(self.path)
+        if not self.append:
+            self.connection.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+            self.connection.commit()
+
+    def _write(self, records):
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns})')
+        self.connection.executemany(
+            f'INSERT INTO "{self.table}" ({columns}) VALUES ({placeholders})',
+            [tuple(record.get(column) for column in self.columns) for record in records],
+        )
+        self.connection.commit()
+
+    def reset(self):
+        super().reset()
+        self.connection.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+        self.connection.commit()
+
+    def truncate(self, rows):
+        try:
+            self.connection.execute(f'DELETE FROM "{self.table}" WHERE rowid NOT IN '
+                                    f'(SELECT rowid FROM "{self.table}" ORDER BY rowid LIMIT ?)', (rows,))
+        except sqlite3.OperationalError:
+            # No page has been written to the table yet
+            return
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class ParquetSink(OutputSink):
+    """Stream records to a Parquet file (requires pyarrow).
+
+    A Parquet file is only readable once its footer is written, so each page is written as its
+    own part file in <path>.parts/ and close() combines the parts, after the rows already in the
+    file when appending, into the final file. Parts left behind by a crash are kept by the next
+    run that appends and are read by read_frame.
+    """
+
+    def open(self):
+        super().open()
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        self.parts_dir = Path(parquet_parts_dir(self.path))
+        if not self.append:
+            self._remove_parts()
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        self.next_part = len(_parquet_parts(self.path))
+
+    def _write(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        part = self.parts_dir / f"part-{self.next_part:06d}.parquet"
+        tmp_part = part.with_suffix(".tmp")
+        pq.write_table(pa.Table.from_pylist(records), tmp_part)
+        os.replace(tmp_part, part)
+        self.next_part += 1
+
+    def reset(self):
+        super().reset()
+        self._remove_parts()
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        self.next_part = 0
+        self.append = False
+
+    def truncate(self, rows):
+        import pyarrow.parquet as pq
+        files = ([Path(self.path)] if self.append and os.path.exists(self.path) else []) + _parquet_parts(self.path)
+        for file in files:
+            file_rows = pq.read_metadata(file).num_rows
+            if rows >= file_rows:
+                rows -= file_rows
+            elif rows > 0:
+                tmp_file = file.with_suffix(".tmp")
+                pq.write_table(pq.read_table(file).slice(0, rows), tmp_file)
+                os.replace(tmp_file, file)
+                rows = 0
+            elif file == Path(self.path):
+                file.unlink()
+                self.append = False
+            else:
+                file.unlink()
+        self.next_part = len(_parquet_parts(self.path))
+
+    def close(self):
+        import pyarrow.parquet as pq
+        parts = _parquet_parts(self.path)
+        if parts:
+            tables = [pq.read_table(self.path)] if self.append and os.path.exists(self.path) else []
+            tables += [pq.read_table(part) for part in parts]
+            tmp_path = self.path + ".tmp"
+            writer = pq.ParquetWriter(tmp_path, tables[0].schema)
+            for table in tables:
+                writer.write_table(table.cast(tables[0].schema))
+            writer.close()
+            os.replace(tmp_path, self.path)
+        self._remove_parts()
+
+    def _remove_parts(self):
+        for part in self.parts_dir.glob("*"):
+            part.unlink()
+        if self.parts_dir.exists():
+            self.parts_dir.rmdir()
+
+
+def _replace_file(path, write, newline=None):
+    """Rewrite the file at path atomically with write(file)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline=newline, encoding="utf-8") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def parquet_parts_dir(path):
+    """Return the directory holding the not yet combined pages of a Parquet output file."""
+    return f"{path}.parts"
+
+
+def _parquet_parts(path):
+    """Return the part files of a Parquet output file in page order."""
+    return sorted(Path(parquet_parts_dir(path)).glob("part-*.parquet"))
+
+
+def output_exists(path):
+    """Return True if path, or pages of it that a crashed run did not finish, hold rows."""
+    return os.path.exists(path) or bool(_parquet_parts(path))
+
+
+class TeeSink(OutputSink):
+    """Forward every page to several sinks that are opened and closed by their owners."""
+
+    def __init__(self, *sinks):
+        """Initialize the tee with the sinks to forward to."""
+        super().__init__(sinks[0].path)
+        self.sinks = sinks
+
+    def _write(self, records):
+        for sink in self.sinks:
+            sink.write_page(records)
+
+    def reset(self):
+        super().reset()
+        for sink in self.sinks:
+            sink.reset()
+
+    def truncate(self, rows):
+        # Only the first sink holds rows from before this run; the others are filled from scratch
+        self.sinks[0].truncate(rows)
+
+
+SINKS = {
+    ".csv": CsvSink,
+    ".jsonl": JsonLinesSink,
+    ".sqlite": SqliteSink,
+    ".db": SqliteSink,
+    ".parquet": ParquetSink,
+}
+
+
+def create_sink(path, append=False):
+    """Return an unopened sink for path, chosen by its file extension."""
+    extension = Path(path).suffix.lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format: {extension} (expected one of {', '.join(SINKS)})")
+    return SINKS[extension](path, append=append)
+
+
+def read_frame(path):
+    """Read a file written by one of the sinks into a DataFrame."""
+    import pandas as pd
+    extension = Path(path).suffix.lower()
+    if extension == ".csv":
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    if extension == ".jsonl":
+        return pd.read_json(path, lines=True, dtype=False)
+    if extension in (".sqlite", ".db"):
+        with sqlite3.connect(path) as connection:
+            return pd.read_sql_query('SELECT * FROM "records"', connection)
+    if extension == ".parquet":
+        # Pages of a run that crashed before combining them follow the rows of the file
+        files = ([path] if os.path.exists(path) else []) + _parquet_parts(path)
+        return pd.concat([pd.read_parquet(file) for file in files], ignore_index=True)
+    raise ValueError(f"Unsupported output format: {extension}")
+
+
+def write_frame(df, path):
+    """Write a DataFrame to path in the format given by its extension."""
+    extension = Path(path).suffix.lower()
+    if extension == ".xlsx":
+        df.to_excel(path, index=False)
+    elif extension == ".csv":
+        df.to_csv(path, index=False)
+    elif extension == ".jsonl":
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    elif extension == ".parquet":
+        df.to_parquet(path, index=False)
+    elif extension in (".sqlite", ".db"):
+        with sqlite3.connect(path) as connection:
+            df.to_sql("records", connection, if_exists="replace", index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {extension}")
+
+
+def convert_to_excel(source, destination, typed=False, logger=None):
+    """Convert a streamed output file to an Excel workbook and return the number of rows.
+
+    With typed=True the columns are written as numbers, dates and categories, and a second
+    sheet holds the median price per m² by month and location; rows whose Cena/m² does not
+    match Cena / Površina are counted in the logger's output.
+    """
+    df = read_frame(source)
+    if not typed:
+        df.to_excel(destination, index=False)
+        return len(df)
+    import pandas as pd
+    from processing import aggregate_by_location, log_unit_price_mismatches, normalize_frame
+    df = normalize_frame(df)
+    if logger is not None:
+        log_unit_price_mismatches(df, logger)
+    with pd.ExcelWriter(destination) as writer:
+        df.to_excel(writer, sheet_name="Data", index=False)
+        aggregate_by_location(df).to_excel(writer, sheet_name="By location", index=False)
+    return len(df)
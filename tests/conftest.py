@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture(scope="session")
+def mock_site():
+    """Serve the local stand-in site for the whole test session and return its base URL."""
+    from mock_server import start_server
+    server, base_url = start_server()
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def work_dir(tmp_path_factory):
+    """Run the tests in a scratch directory, so the log files and default outputs stay out of the tree."""
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("run"))
+    yield
+    os.chdir(previous)
@@ -0,0 +1,34 @@
+"""Disk cache slots of lean scrapers are given back, also by batch worker processes."""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import browser_profile
+from logger import Logger
+from scraper import RealEstateScraper
+
+
+def _use_root(root):
+    browser_profile.claim_cache_dir.__defaults__ = (root,)
+
+
+def _claim_slot(root):
+    global _scraper
+    # Kept alive like the worker's scraper in batch.py, so only the process exit can release the slot
+    _scraper = RealEstateScraper(Logger(level="error"), lean=True)
+    return [lock.relative_to(root).as_posix() for lock in root.glob("*/scraper.lock")]
+
+
+def test_worker_process_releases_its_slot_on_exit(tmp_path):
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(1, mp_context=context, initializer=_use_root, initargs=(tmp_path,)) as pool:
+        held = pool.submit(_claim_slot, tmp_path).result()
+    assert held == ["slot-0/scraper.lock"]
+    assert not list(tmp_path.glob("*/scraper.lock"))
+
+
+def test_slot_is_released_when_the_scraper_is_gone(monkeypatch, tmp_path):
+    monkeypatch.setattr(browser_profile.claim_cache_dir, "__defaults__", (tmp_path,))
+    scraper = RealEstateScraper(Logger(level="error"), lean=True)
+    assert (tmp_path / "slot-0" / "scraper.lock").exists()
+    del scraper
+    assert not list(tmp_path.glob("*/scraper.lock"))
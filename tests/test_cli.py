@@ -0,0 +1,38 @@
+"""Job spec parsing and option handling of the command-line entry point."""
+import pytest
+
+import cli
+
+
+def test_malformed_yaml_spec_is_a_usage_error(tmp_path, capsys):
+    pytest.importorskip("yaml")
+    spec = tmp_path / "jobs.yaml"
+    spec.write_text("jobs: [a: b: c\n", encoding="utf-8")
+    assert cli.main(["--jobs", str(spec)]) == cli.EXIT_USAGE
+    assert "invalid YAML" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("spec", [
+    {"jobs": {"period": "Januar"}},
+    {"jobs": ["Januar"]},
+    {"jobs": [{"period": "Januar", "month": 1}]},
+    {"matrix": ["monthly"]},
+    {"matrix": {"view_types": ["monthly"], "periods": ["Januar"], "years": 2019, "regions": ["Niš"]}},
+    {"matrix": {"view_types": ["monthly"], "periods": ["Januar"], "years": ["2019"]}},
+    {"jobs": [{"view_type": "weekly", "period": "Januar", "year": 2019, "region": "Niš"}]},
+])
+def test_invalid_specs_raise_job_spec_error(spec):
+    with pytest.raises(cli.JobSpecError):
+        cli.jobs_from_spec(spec)
+
+
+def test_matrix_spec_builds_the_cartesian_product():
+    jobs = cli.jobs_from_spec({"matrix": {"view_types": ["monthly"], "periods": ["Januar", "Februar"],
+                                          "years": [2019, 2020], "regions": ["Niš"]}})
+    assert [(job.period, job.year, job.sub_region) for job in jobs] == [
+        ("Januar", "2019", "Sve"), ("Januar", "2020", "Sve"), ("Februar", "2019", "Sve"), ("Februar", "2020", "Sve")]
+
+
+def test_http_backend_requires_an_endpoint(capsys):
+    assert cli.main(["--period", "Januar", "--year", "2019", "--region", "Niš", "--backend", "http"]) == cli.EXIT_USAGE
+    assert "--endpoint" in capsys.readouterr().err
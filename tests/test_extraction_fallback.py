@@ -0,0 +1,105 @@
+"""Network-capture extraction falling back to DOM scraping, without a browser."""
+import pytest
+
+from logger import Logger
+from scraper import ExtractionFallback, RealEstateScraper
+from sinks import create_sink, read_frame
+
+PAGE_SIZE = 10
+TOTAL = 30
+
+
+class FakeSite:
+    """A grid of TOTAL rows whose network responses stop being recognised from page broken_from on."""
+
+    def __init__(self, broken_from=None):
+        self.page = 1
+        self.broken_from = broken_from
+
+    def displayed_rows(self):
+        first = (self.page - 1) * PAGE_SIZE + 1
+        return first, min(first + PAGE_SIZE - 1, TOTAL), TOTAL
+
+    def rows(self, raw):
+        first, last, _ = self.displayed_rows()
+        return [{"Cena": str(i * 1000) if raw else f"{i}.000 €"} for i in range(first, last + 1)]
+
+    def network_rows(self, page):
+        if self.broken_from is not None and self.page >= self.broken_from:
+            return None
+        return self.rows(raw=True)
+
+    def next_page(self):
+        if self.page * PAGE_SIZE >= TOTAL:
+            return False
+        self.page += 1
+        return True
+
+    def reload(self, *filters):
+        self.page = 1
+
+
+class FakeWaiter:
+    def total_wait(self):
+        return 0.0
+
+
+@pytest.fixture
+def make_scraper(monkeypatch):
+    def make(site):
+        scraper = RealEstateScraper(Logger(level="error"), extraction_mode="network")
+        scraper.waiter = FakeWaiter()
+        monkeypatch.setattr(scraper, "set_filters", site.reload)
+        monkeypatch.setattr(scraper, "read_displayed_rows", site.displayed_rows)
+        monkeypatch.setattr(scraper, "select_largest_page_size", lambda: PAGE_SIZE)
+        monkeypatch.setattr(scraper, "wait_for_element", lambda *args, **kwargs: None)
+        monkeypatch.setattr(scraper, "go_to_next_page", site.next_page)
+        monkeypatch.setattr(scraper, "extract_rows_network", site.network_rows)
+        monkeypatch.setattr(scraper, "extract_rows_bulk", lambda page: site.rows(raw=False))
+        monkeypatch.setattr(scraper, "record_resource_usage", lambda: None)
+        return scraper
+    return make
+
+
+def scrape(scraper, path):
+    with create_sink(path) as sink:
+        rows = scraper.scrape_job(("monthly", "Februar", "2019", "Niš", "Sve"), sink)
+    return rows, list(read_frame(path)["Cena"])
+
+
+def test_whole_job_uses_network_capture_while_it_is_recognised(make_scraper, tmp_path):
+    rows, prices = scrape(make_scraper(FakeSite()), tmp_path / "out.csv")
+    assert rows == TOTAL
+    assert prices == [str(i * 1000) for i in range(1, TOTAL + 1)]
+
+
+def test_unrecognised_first_page_switches_the_job_to_dom_scraping(make_scraper, tmp_path):
+    site = FakeSite(broken_from=1)
+    scraper = make_scraper(site)
+    calls = []
+    original = site.network_rows
+    site.network_rows = lambda page: calls.append(page) or original(page)
+    scraper.extract_rows_network = site.network_rows
+    rows, prices = scrape(scraper, tmp_path / "out.csv")
+    assert rows == TOTAL
+    assert prices == [f"{i}.000 €" for i in range(1, TOTAL + 1)]
+    assert calls == [1]
+
+
+def test_fallback_after_network_pages_scrapes_the_job_again(make_scraper, tmp_path):
+    scraper = make_scraper(FakeSite(broken_from=2))
+    rows, prices = scrape(scraper, tmp_path / "out.csv")
+    assert rows == TOTAL
+    assert prices == [f"{i}.000 €" for i in range(1, TOTAL + 1)]
+    assert scraper.metrics.counters["extraction_fallbacks"] == 1
+    assert scraper.metrics.counters["rows"] == TOTAL
+
+
+def test_extract_rows_raises_once_network_pages_were_read(make_scraper):
+    site = FakeSite(broken_from=2)
+    scraper = make_scraper(site)
+    assert len(scraper.extract_rows(1)) == PAGE_SIZE
+    site.next_page()
+    with pytest.raises(ExtractionFallback):
+        scraper.extract_rows(2)
+    assert scraper.dom_fallback
@@ -0,0 +1,61 @@
+"""Full jobs against the local stand-in site with injected faults (needs Chrome; skipped without it).
+
+Each scenario serves the site with different faults (see benchmarks/mock_server.py and
+benchmarks/fixtures/site.html): failed data requests, pages re-rendered while they are read,
+slow responses, or all of them. Every row must still arrive exactly once.
+"""
+import pytest
+
+import network_capture
+from bench_processing import grid_text
+from logger import Logger
+from mock_server import generate_row
+from scraper import RealEstateScraper
+from sinks import create_sink, read_frame
+
+JOB = ("monthly", "Februar", "2019", "Niš", "Sve")
+ROWS = 600
+SCENARIOS = {
+    "healthy": "",
+    "failing": "fail=0.2",
+    "stale": "stale=0.5",
+    "slow": "slow=0.3&slowms=1500",
+    "combined": "fail=0.1&stale=0.3&slow=0.2&slowms=1000",
+}
+
+
+@pytest.fixture(scope="module")
+def chrome(mock_site):
+    """Skip the module unless a headless Chrome can be started."""
+    scraper = RealEstateScraper(Logger(level="error"), headless=True, base_url=mock_site)
+    try:
+        scraper.initialize_driver()
+    except Exception as e:
+        pytest.skip(f"Chrome is not available ({type(e).__name__})")
+    finally:
+        scraper.close()
+
+
+def expected_records(mode):
+    """Return the records the scraper should produce for JOB in the given extraction mode."""
+    filters = dict(zip(("view_type", "period", "year", "region", "sub_region"), JOB))
+    records = [network_capture.map_record(generate_row(i, filters)) for i in range(ROWS)]
+    return records if mode == "network" else [grid_text(record) for record in records]
+
+
+@pytest.mark.parametrize("mode", ["bulk", "network"])
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_every_row_arrives_once(chrome, mock_site, tmp_path, scenario, mode):
+    faults = SCENARIOS[scenario]
+    url = f"{mock_site}/?rows={ROWS}&seed=1" + (f"&{faults}" if faults else "")
+    scraper = RealEstateScraper(Logger(level="error"), headless=True, extraction_mode=mode, base_url=url,
+                                max_wait=10, page_retries=5, retry_backoff=0.25)
+    output = tmp_path / f"{mode}.csv"
+    try:
+        scraper.initialize_driver()
+        with create_sink(output) as sink:
+            rows = scraper.scrape_job(JOB, sink)
+    finally:
+        scraper.close()
+    assert rows == ROWS
+    assert read_frame(output).to_dict("records") == expected_records(mode)
@@ -0,0 +1,72 @@
+"""HttpBackend against the data endpoint of the local stand-in site (benchmarks/mock_server.py)."""
+import os
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import network_capture
+from backends import HttpBackend
+from batch import build_jobs
+from cache import ResultCache
+from logger import Logger
+from mock_server import generate_row
+from sinks import create_sink, read_frame
+
+ROWS = 234
+JOBS = build_jobs(["monthly"], ["Januar", "Februar", "Mart"], ["2019", "2020"], ["Niš"])
+
+
+def expected_records(job, rows=ROWS):
+    return [network_capture.map_record(generate_row(i, job._asdict())) for i in range(rows)]
+
+
+def scrape(base_url, output_dir, query="", jobs=JOBS, cache=None, **options):
+    backend = HttpBackend(Logger(level="error"), f"{base_url}/api/transactions?rows={ROWS}{query}",
+                          retry_backoff=0.01, **options)
+    return backend.scrape_jobs(jobs, lambda job: create_sink(
+        os.path.join(output_dir, f"{job.period}_{job.year}.csv")), cache=cache)
+
+
+def test_jobs_return_the_served_records(mock_site, tmp_path):
+    results = scrape(mock_site, tmp_path, concurrency=4, page_size=50)
+    assert [result.job for result in results] == JOBS
+    for result in results:
+        assert result.ok, result.error
+        assert result.rows == ROWS
+        assert read_frame(result.output).to_dict("records") == expected_records(result.job)
+        assert result.metrics["counters"]["pages"] == 5
+
+
+def test_failed_requests_are_retried(mock_site, tmp_path):
+    results = scrape(mock_site, tmp_path, "&fail=0.3&seed=7", retries=8, page_size=50)
+    for result in results:
+        assert result.ok, result.error
+        assert read_frame(result.output).to_dict("records") == expected_records(result.job)
+    assert sum(result.metrics["counters"].get("http_retries", 0) for result in results) > 0
+
+
+def test_job_fails_once_retries_are_used_up(mock_site, tmp_path):
+    results = scrape(mock_site, tmp_path, "&fail=1", jobs=JOBS[:1], retries=2)
+    assert not results[0].ok
+    assert "after 2 attempts" in results[0].error
+    assert results[0].metrics["counters"]["http_retries"] == 2
+
+
+def test_request_params_use_the_configured_names():
+    backend = HttpBackend(Logger(level="error"), "http://example.test/data?lang=sr",
+                          params={"region": "opstina"}, page_param="p", page_size_param="limit")
+    params = backend.request_params(JOBS[0], 2, 100)
+    assert backend.endpoint == "http://example.test/data"
+    assert params == {"lang": "sr", "view_type": "monthly", "period": "Januar", "year": "2019",
+                      "opstina": "Niš", "sub_region": "Sve", "p": "2", "limit": "100"}
+
+
+def test_cached_jobs_are_served_without_requests(mock_site, tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    first = scrape(mock_site, tmp_path / "first", jobs=JOBS[:2], cache=cache)
+    second = scrape(mock_site, tmp_path / "second", jobs=JOBS[:2], cache=cache)
+    for before, after in zip(first, second):
+        assert after.ok and after.rows == before.rows == ROWS
+        assert after.metrics["counters"]["cache_hits"] == 1
+        assert read_frame(after.output).to_dict("records") == expected_records(after.job)
@@ -0,0 +1,297 @@
+"""Retries, backoff, pagination checks and adaptive pacing, against a fake grid instead of a browser."""
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from logger import Logger
+from metrics import RunMetrics
+from scraper import PaginationError, RealEstateScraper
+from waits import AdaptivePacer, GridLoadError
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the pauses instead of sleeping."""
+    pauses = []
+    monkeypatch.setattr("time.sleep", pauses.append)
+    return pauses
+
+
+class FakeGrid:
+    """The pagination of a grid with total rows, page_size per page, and scripted faults.
+
+    faults is a list of what the next clicks on "Sledeća strana" do: "ignored" (the grid stays),
+    "late" (the page changes but page_changed times out), "error" (the grid shows its error alert)
+    or "skip" (the grid jumps one page too far). Clicks without a fault move one page on.
+    """
+
+    def __init__(self, total=100, page_size=25, faults=()):
+        self.total = total
+        self.page_size = page_size
+        self.first = 1
+        self.faults = list(faults)
+        self.clicks = 0
+        self.pending = None
+
+    def displayed_rows(self):
+        return self.first, min(self.first + self.page_size - 1, self.total), self.total
+
+    def click_next(self):
+        self.clicks += 1
+        fault = self.faults.pop(0) if self.faults else None
+        if fault != "ignored":
+            self.first += self.page_size * (2 if fault == "skip" else 1)
+        self.pending = fault
+
+    def page_changed(self):
+        fault, self.pending = self.pending, None
+        if fault in ("ignored", "late"):
+            raise TimeoutException("page did not change")
+        if fault == "error":
+            raise GridLoadError("Grid shows an error")
+
+
+class FakeWaiter:
+    def __init__(self, grid):
+        self.grid = grid
+
+    def grid_signature(self):
+        return self.grid.displayed_rows()
+
+    def page_changed(self, signature, timeout=None):
+        self.grid.page_changed()
+
+    def grid_idle(self, timeout=None):
+        pass
+
+    def menu_closed(self, timeout=None):
+        pass
+
+
+def make_scraper(monkeypatch, grid, **options):
+    """Return a RealEstateScraper whose page interactions go to grid."""
+    scraper = RealEstateScraper(Logger(level="error"), page_retries=3, retry_backoff=0.5, **options)
+    scraper.waiter = FakeWaiter(grid)
+    monkeypatch.setattr(scraper, "read_displayed_rows", grid.displayed_rows)
+    monkeypatch.setattr(scraper, "wait_for_element", lambda *args, **kwargs: "next button")
+    monkeypatch.setattr(scraper, "safe_click", lambda element: grid.click_next())
+    return scraper
+
+
+class TestAdaptivePacer:
+    def test_no_pause_while_healthy(self):
+        pacer = AdaptivePacer()
+        for _ in range(10):
+            pacer.record(0.5)
+        assert pacer.delay == 0.0
+
+    def test_slow_transition_starts_pausing_and_failures_double_the_pause(self):
+        metrics = RunMetrics()
+        pacer = AdaptivePacer(max_delay=1.0, metrics=metrics)
+        pacer.record(0.5)
+        pacer.record(2.0)
+        assert pacer.delay == 0.25
+        assert metrics.counters["slow_pages"] == 1
+        delays = []
+        for _ in range(4):
+            pacer.record_failure()
+            delays.append(pacer.delay)
+        assert delays == [0.5, 1.0, 1.0, 1.0]
+
+    def test_healthy_transitions_halve_the_pause_back_to_the_minimum(self):
+        pacer = AdaptivePacer()
+        for _ in range(4):
+            pacer.record_failure()
+        assert pacer.delay == 2.0
+        delays = []
+        for _ in range(4):
+            pacer.record(0.5)
+            delays.append(pacer.delay)
+        assert delays == [1.0, 0.5, 0.25, 0.0]
+
+    def test_lasting_slowdown_becomes_the_new_normal(self):
+        pacer = AdaptivePacer()
+        pacer.record(0.5)
+        slow_pages = 0
+        for _ in range(30):
+            before = pacer.delay
+            pacer.record(2.0)
+            slow_pages += pacer.delay > before
+        assert pacer.delay == 0.0
+        assert slow_pages < 5
+
+    def test_wait_sleeps_the_pause_and_records_it(self, sleeps):
+        metrics = RunMetrics()
+        pacer = AdaptivePacer(metrics=metrics)
+        pacer.wait()
+        assert sleeps == []
+        pacer.record_failure()
+        pacer.wait()
+        assert sleeps == [0.25]
+        assert metrics.phases["wait:pacing"]["seconds"] == 0.25
+
+
+class TestRetryTransient:
+    def test_transient_errors_are_retried_with_exponential_backoff(self, monkeypatch, sleeps):
+        scraper = make_scraper(monkeypatch, FakeGrid())
+        errors = [TimeoutException(), StaleElementReferenceException(), GridLoadError("error alert")]
+
+        def action():
+            if errors:
+                raise errors.pop(0)
+            return "done"
+
+        assert scraper.retry_transient(action, "Action") == "done"
+        assert sleeps == [0.5, 1.0, 2.0]
+        assert scraper.metrics.counters["retries"] == 3
+        assert scraper.pacer.delay > 0
+
+    def test_last_error_is_raised_once_retries_are_used_up(self, monkeypatch, sleeps):
+        scraper = make_scraper(monkeypatch, FakeGrid())
+        calls = []
+
+        def action():
+            calls.append(1)
+            raise TimeoutException("still loading")
+
+        with pytest.raises(TimeoutException):
+            scraper.retry_transient(action, "Action")
+        assert len(calls) == 4
+        assert sleeps == [0.5, 1.0, 2.0]
+
+    def test_other_errors_are_not_retried(self, monkeypatch, sleeps):
+        scraper = make_scraper(monkeypatch, FakeGrid())
+        with pytest.raises(KeyError):
+            scraper.retry_transient(lambda: {}["missing"], "Action")
+        assert sleeps == []
+
+
+class TestExtractPageWithRetry:
+    @pytest.fixture
+    def scraper(self, monkeypatch):
+        return make_scraper(monkeypatch, FakeGrid(total=100, page_size=25))
+
+    def serve(self, monkeypatch, scraper, pages):
+        """Make extract_rows return (or raise) the given results one after another."""
+        def extract_rows(page):
+            result = pages.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return [{"row": i} for i in range(result)]
+        monkeypatch.setattr(scraper, "extract_rows", extract_rows)
+
+    def test_short_page_is_read_again(self, monkeypatch, scraper, sleeps):
+        self.serve(monkeypatch, scraper, [20, 25])
+        assert len(scraper.extract_page_with_retry(1)) == 25
+        assert sleeps == [0.5]
+
+    def test_short_page_is_accepted_on_the_last_attempt(self, monkeypatch, scraper, sleeps):
+        self.serve(monkeypatch, scraper, [20, 20, 20, 24])
+        assert len(scraper.extract_page_with_retry(1)) == 24
+        assert sleeps == [0.5, 1.0, 2.0]
+
+    def test_page_that_keeps_failing_returns_none(self, monkeypatch, scraper, sleeps):
+        self.serve(monkeypatch, scraper, [StaleElementReferenceException()] * 4)
+        assert scraper.extract_page_with_retry(1) is None
+        assert scraper.metrics.counters["retries"] == 3
+
+
+class TestPagination:
+    def test_advances_one_page_per_call_until_the_last(self, monkeypatch, sleeps):
+        grid = FakeGrid(total=60, page_size=25)
+        scraper = make_scraper(monkeypatch, grid)
+        assert scraper.go_to_next_page()
+        assert scraper.go_to_next_page()
+        assert grid.displayed_rows() == (51, 60, 60)
+        assert not scraper.go_to_next_page()
+        assert grid.clicks == 2
+
+    def test_ignored_click_is_repeated(self, monkeypatch, sleeps):
+        grid = FakeGrid(faults=["ignored", "error"])
+        scraper = make_scraper(monkeypatch, grid)
+        assert scraper.go_to_next_page()
+        assert grid.displayed_rows()[0] == 26
+        # The click that raised the error alert did move the grid, so it is not clicked a third time
+        assert grid.clicks == 2
+        assert scraper.metrics.counters["retries"] == 2
+
+    def test_page_that_changed_late_is_not_clicked_again(self, monkeypatch, sleeps):
+        grid = FakeGrid(faults=["late"])
+        scraper = make_scraper(monkeypatch, grid)
+        assert scraper.go_to_next_page()
+        assert grid.displayed_rows()[0] == 26
+        assert grid.clicks == 1
+
+    def test_grid_that_skips_rows_raises_pagination_error(self, monkeypatch, sleeps):
+        grid = FakeGrid(faults=["skip"])
+        scraper = make_scraper(monkeypatch, grid)
+        with pytest.raises(PaginationError, match="continues at row 51 instead of 26"):
+            scraper.go_to_next_page()
+        assert grid.clicks == 1
+
+    def test_pacer_follows_the_transitions(self, monkeypatch, sleeps):
+        grid = FakeGrid(total=1000, faults=["ignored"])
+        scraper = make_scraper(monkeypatch, grid)
+        scraper.go_to_next_page()
+        # Backoff after the ignored click, then the pause the failure added before clicking again
+        assert sleeps == [0.5, 0.25]
+        assert scraper.pacer.delay == 0.0
+
+
+def test_stale_pagination_text_is_read_again(monkeypatch):
+    scraper = RealEstateScraper(Logger(level="error"))
+    scraper.waiter = FakeWaiter(FakeGrid())
+    texts = [StaleElementReferenceException(), "26–50 od 1.234"]
+
+    class Pagination:
+        @property
+        def text(self):
+            text = texts.pop(0)
+            if isinstance(text, Exception):
+                raise text
+            return text
+
+    monkeypatch.setattr(scraper, "wait_for_element", lambda *args, **kwargs: Pagination())
+    assert scraper.read_displayed_rows() == (26, 50, 1234)
+
+
+def test_pagination_text_is_read_once_the_grid_is_idle(monkeypatch):
+    scraper = RealEstateScraper(Logger(level="error"))
+    events = []
+
+    class Waiter:
+        def grid_idle(self, timeout=None):
+            events.append("idle")
+
+    class Pagination:
+        @property
+        def text(self):
+            events.append("read")
+            return "1–25 od 100"
+
+    scraper.waiter = Waiter()
+    monkeypatch.setattr(scraper, "wait_for_element", lambda *args, **kwargs: Pagination())
+    assert scraper.read_displayed_rows() == (1, 25, 100)
+    assert events == ["idle", "read"]
+
+
+def test_full_reload_after_a_kept_page_starts_from_a_clean_browser(monkeypatch):
+    scraper = RealEstateScraper(Logger(level="error"))
+    events = []
+
+    class Driver:
+        def get(self, url):
+            events.append("get")
+
+        def execute_script(self, script):
+            pass
+
+    scraper.driver = Driver()
+    monkeypatch.setattr(scraper.session, "reset", lambda: events.append("reset"))
+    monkeypatch.setattr(scraper, "change_filters", lambda *filters: False)
+    for name in ("safe_click", "wait_for_element", "select_view_type", "select_option", "apply_filters"):
+        monkeypatch.setattr(scraper, name, lambda *args, **kwargs: None)
+    scraper.set_filters("monthly", "Februar", "2019", "Niš")
+    assert events == ["get"]
+    scraper.set_filters("monthly", "Mart", "2019", "Niš")
+    assert events == ["get", "reset", "get"]
+    assert scraper.applied_filters == ("monthly", "Mart", "2019", "Niš", "Sve")
@@ -0,0 +1,163 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# Open MUI Select menu (rendered in a popover) and its backdrop
+MENU_SELECTOR = ".MuiMenu-paper, .MuiPopover-paper ul[role='listbox']"
+MENU_BACKDROP_SELECTOR = ".MuiPopover-root, .MuiMenu-root"
+
+# Returns true while the DataGrid shows its loading overlay or a progress bar
+GRID_LOADING_JS = """
+return document.querySelector(
+    '.MuiDataGrid-overlay .MuiCircularProgress-root, ' +
+    '.MuiDataGrid-overlay .MuiLinearProgress-root, ' +
+    '.MuiDataGrid-loadingOverlay'
+) !== null;
+"""
+
+# Pagination text plus the text of the first row identify the page currently shown
+GRID_SIGNATURE_JS = """
+const pagination = document.querySelector('.MuiTablePagination-displayedRows');
+const firstRow = document.querySelector('.MuiDataGrid-row');
+return [pagination ? pagination.textContent : '', firstRow ? firstRow.innerText : ''].join('|');
+"""
+
+# Returns the text of an error alert shown in or over the DataGrid, or null
+GRID_ERROR_JS = """
+const alert = document.querySelector('.MuiDataGrid-root [role="alert"], .MuiDataGrid-overlay .MuiAlert-root');
+return alert ? (alert.textContent || '').trim() || 'error' : null;
+"""
+
+
+class GridLoadError(Exception):
+    """Raised when the DataGrid reports that loading its rows failed."""
+
+
+class AdaptiveWaiter:
+    """Wait on page signals (menus, loading overlay, pagination) instead of fixed sleeps."""
+
+    def __init__(self, driver, logger, max_wait=20, poll_frequency=0.05, metrics=None):
+        """Initialize the waiter with a driver, logger, upper bound, poll interval in seconds
+        and an optional RunMetrics that receives every wait as a "wait:<name>" phase."""
+        self.driver = driver
+        self.logger = logger
+        self.metrics = metrics
+        self.max_wait = max_wait
+        self.poll_frequency = poll_frequency
+        self.history = []
+
+    def until(self, name, condition, timeout=None, kind=None):
+        """Wait until condition(driver) is truthy and record how long it took.
+
+        kind groups waits in the metrics (defaults to name).
+        """
+        start = time.perf_counter()
+        try:
+            wait = WebDriverWait(self.driver, timeout or self.max_wait, poll_frequency=self.poll_frequency)
+            return wait.until(condition)
+        except TimeoutException:
+            self.logger.log(f"Timeout after {time.perf_counter() - start:.2f}s waiting for {name}", "error")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.history.append((name, elapsed))
+            if self.metrics is not None:
+                self.metrics.add(f"wait:{kind or name}", elapsed)
+            self.logger.log(f"Waited {elapsed:.2f}s for {name}", "debug")
+
+    def menu_open(self, timeout=None):
+        """Wait until a MUI Select menu is visible."""
+        return self.until("menu to open",
+                          EC.visibility_of_element_located((By.CSS_SELECTOR, MENU_SELECTOR)), timeout, "menu_open")
+
+    def menu_closed(self, timeout=None):
+        """Wait until no MUI Select menu or backdrop is left on the page."""
+        return self.until("menu to close",
+                          EC.invisibility_of_element_located((By.CSS_SELECTOR, MENU_BACKDROP_SELECTOR)), timeout, "menu_closed")
+
+    def grid_idle(self, timeout=None):
+        """Wait until the DataGrid loading overlay is gone."""
+        return self.until("grid to finish loading",
+                          lambda driver: not driver.execute_script(GRID_LOADING_JS), timeout, "grid_idle")
+
+    def grid_signature(self):
+        """Return a string identifying the grid page currently displayed."""
+        return self.driver.execute_script(GRID_SIGNATURE_JS)
+
+    def grid_error(self):
+        """Return the text of the DataGrid's error alert, or None if it shows none."""
+        return self.driver.execute_script(GRID_ERROR_JS)
+
+    def page_changed(self, previous_signature, timeout=None):
+        """Wait until the pagination text or first row differs from previous_signature.
+
+        Raises GridLoadError as soon as the grid shows an error instead of the new page.
+        """
+        def changed(driver):
+            if driver.execute_script(GRID_LOADING_JS):
+                return False
+            if driver.execute_script(GRID_SIGNATURE_JS) != previous_signature:
+                return True
+            error = driver.execute_script(GRID_ERROR_JS)
+            if error:
+                raise GridLoadError(error)
+            return False
+        return self.until("next page to render", changed, timeout, "page_change")
+
+    def total_wait(self):
+        """Return the total number of seconds spent waiting."""
+        return sum(elapsed for _, elapsed in self.history)
+
+
+class AdaptivePacer:
+    """Pause between page requests, longer while the site is slow or failing and shorter while it is healthy.
+
+    Every page transition is recorded. One that takes more than slow_factor times the usual
+    duration (a moving average), or fails, doubles the pause up to max_delay; a normal one
+    halves it until it drops back to min_delay.
+    """
+
+    def __init__(self, min_delay=0.0, max_delay=5.0, initial_step=0.25, slow_factor=3.0, smoothing=0.2,
+                 metrics=None):
+        """Initialize the pacer with pause bounds in seconds, the first non-zero pause, the slowdown
+        factor, the weight of the latest duration in the moving average and an optional RunMetrics."""
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_step = initial_step
+        self.slow_factor = slow_factor
+        self.smoothing = smoothing
+        self.metrics = metrics
+        self.delay = min_delay
+        self.typical = None
+
+    def wait(self):
+        """Sleep for the current pause before the next request."""
+        if self.delay <= 0:
+            return
+        time.sleep(self.delay)
+        if self.metrics is not None:
+            self.metrics.add("wait:pacing", self.delay)
+
+    def record(self, seconds):
+        """Record a page transition that succeeded after seconds and adapt the pause."""
+        if self.typical is not None and seconds > self.slow_factor * self.typical:
+            self._slow_down()
+            if self.metrics is not None:
+                self.metrics.count("slow_pages")
+        else:
+            self._speed_up()
+        # A lasting slowdown becomes the new normal through the moving average
+        self.typical = seconds if self.typical is None else \
+            (1 - self.smoothing) * self.typical + self.smoothing * seconds
+
+    def record_failure(self):
+        """Record a failed request and lengthen the pause."""
+        self._slow_down()
+
+    def _slow_down(self):
+        self.delay = min(self.max_delay, max(self.delay * 2, self.initial_step))
+
+    def _speed_up(self):
+        self.delay = self.delay / 2 if self.delay / 2 >= self.initial_step else self.min_delay